@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Expected Interface State Store
+==============================
+Read-only access to the expected (golden) interfaces of each device, used by
+the week-03 Robot audits. Three layouts are supported:
+
+- a single JSON file {"device": [interfaces...], ...} (expected_interfaces.json)
+- a directory of per-device shards, <directory>/<device>.json holding the
+  interface list of one device
+- a SQLite database with an expected_interfaces(device, interfaces) table,
+  the interfaces column holding the JSON interface list
+
+Stores are shared per path within a process and cache what they read, keyed
+by the file modification time: a file is parsed again only after it changed.
+With shards or SQLite, only the sections of the requested devices are read.
+
+Convert a JSON file into shards or a database with:
+
+    python expected_state.py expected_interfaces.json expected_interfaces/
+    python expected_state.py expected_interfaces.json expected_interfaces.db
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+SQLITE_TABLE = 'expected_interfaces'
+
+
+class ExpectedStateStore:
+    """Expected interfaces by device, read lazily and cached by file modification time"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: JSON file, shard directory or SQLite database
+        """
+        self.path = Path(path)
+        if self.path.is_dir():
+            self.layout = 'shards'
+        elif self.path.suffix.lower() in SQLITE_SUFFIXES:
+            self.layout = 'sqlite'
+        else:
+            self.layout = 'json'
+        self._lock = threading.Lock()
+        # Cache entries: key -> (file version, value)
+        self._cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+    def devices(self) -> List[str]:
+        """Return the names of the devices with an expected state"""
+        if self.layout == 'shards':
+            return sorted(shard.stem for shard in self.path.glob('*.json'))
+        if self.layout == 'sqlite':
+            return self._cached('devices', self.path, lambda: [
+                row[0] for row in self._query(f"SELECT device FROM {SQLITE_TABLE} ORDER BY device")])
+        return list(self._json_file())
+
+    def get(self, device: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the expected interfaces of a device (None if the device is unknown)
+
+        The returned list is shared by every caller and must not be modified.
+        """
+        if self.layout == 'shards':
+            shard = self.path / f"{device}.json"
+            if not shard.is_file():
+                return None
+            return self._cached(f"device:{device}", shard, lambda: _read_json(shard))
+        if self.layout == 'sqlite':
+            def read():
+                rows = self._query(f"SELECT interfaces FROM {SQLITE_TABLE} WHERE device = ?", (device,))
+                return json.loads(rows[0][0]) if rows else None
+            return self._cached(f"device:{device}", self.path, read)
+        return self._json_file().get(device)
+
+    def _json_file(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._cached('file', self.path, lambda: _read_json(self.path))
+
+    def _cached(self, key: str, path: Path, read) -> Any:
+        version = _version(path)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+        value = read()
+        with self._lock:
+            self._cache[key] = (version, value)
+        return value
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        # One short read-only connection per query keeps the store thread-safe
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+
+_stores: Dict[str, ExpectedStateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path: str) -> ExpectedStateStore:
+    """Return the store of a path, shared by the whole process"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ExpectedStateStore(path)
+        return store
+
+
+def _version(path: Path) -> Tuple[int, int]:
+    """Modification time and size of a file, the cache key of its content"""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_json(path: Path) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def convert(source: str, destination: str) -> int:
+    """
+    Split a JSON expected state file into shards or a SQLite database
+
+    Args:
+        source: expected_interfaces.json
+        destination: Shard directory, or a file ending in .db / .sqlite / .sqlite3
+
+    Returns:
+        Number of devices written
+    """
+    data = _read_json(Path(source))
+    destination = Path(destination)
+
+    if destination.suffix.lower() in SQLITE_SUFFIXES:
+        connection = sqlite3.connect(destination)
+        try:
+            with connection:
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} "
+                                   f"(device TEXT PRIMARY KEY, interfaces TEXT NOT NULL)")
+                connection.executemany(f"INSERT OR REPLACE INTO {SQLITE_TABLE} (device, interfaces) VALUES (?, ?)",
+                                       ((device, json.dumps(interfaces)) for device, interfaces in data.items()))
+        finally:
+            connection.close()
+    else:
+        destination.mkdir(parents=True, exist_ok=True)
+        for device, interfaces in data.items():
+            with open(destination / f"{device}.json", 'w', encoding='utf-8') as f:
+                json.dump(interfaces, f, indent=2)
+
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Split an expected interfaces JSON file into per-device shards or a SQLite database'
+    )
+    parser.add_argument('source', help='Expected interfaces JSON file')
+    parser.add_argument('destination', help='Shard directory, or database file (.db, .sqlite, .sqlite3)')
+    args = parser.parse_args()
+
+    try:
+        count = convert(args.source, args.destination)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    print(f"✅ Wrote the expected interfaces of {count} devices to {args.destination}")
+
+
+if __name__ == '__main__':
+    main()
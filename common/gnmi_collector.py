@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Multi-target gNMI Collector
+===========================
+Runs the OpenConfig interfaces Get against a whole inventory at once and
+returns normalised Interface records per device as each target completes.
+
+Targets come from the week-02 Ansible inventory (inventory.yml plus its
+group_vars / host_vars) or from the week-04 pyATS testbed.yaml. Gets run on a
+bounded thread pool, and every target has its own deadline: a target still
+busy when its deadline expires has its gRPC channel closed, which cancels the
+outstanding RPC, so a fleet audit takes about as long as its slowest device
+instead of the sum of all of them.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from interface_model import Interface
+
+try:
+    from pygnmi.client import gNMIclient
+    HAS_PYGNMI = True
+except ImportError:
+    HAS_PYGNMI = False
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+
+DEFAULT_PORT = 57400
+DEFAULT_WORKERS = 16
+DEFAULT_TIMEOUT = 10.0
+OC_INTERFACES_PATH = 'openconfig-interfaces:interfaces/interface'
+
+# Seconds between deadline checks, and extra time given to a target whose
+# channel was closed at its deadline before it is reported as timed out
+POLL_INTERVAL = 0.2
+DEADLINE_GRACE = 2.0
+
+
+class GnmiTarget:
+    """gNMI connection parameters of one inventory device"""
+
+    __slots__ = ('name', 'host', 'port', 'username', 'password', 'insecure')
+
+    def __init__(self, name: str, host: str, port: int = DEFAULT_PORT,
+                 username: str = '', password: str = '', insecure: bool = True):
+        """
+        Args:
+            name: Inventory name of the device
+            host: IP address or hostname of the gNMI target
+            port: gNMI port number
+            username: Username for authentication
+            password: Password for authentication
+            insecure: Skip TLS certificate validation
+        """
+        self.name = name
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.insecure = insecure
+
+    def __repr__(self) -> str:
+        return f"GnmiTarget({self.name!r}, {self.host}:{self.port})"
+
+
+class CollectResult:
+    """Outcome of the Get against one target"""
+
+    __slots__ = ('target', 'interfaces', 'error', 'elapsed')
+
+    def __init__(self, target: GnmiTarget, interfaces: Optional[List[Interface]] = None,
+                 error: Optional[str] = None, elapsed: float = 0.0):
+        """
+        Args:
+            target: Target the Get ran against
+            interfaces: Normalised interfaces (None when the Get failed)
+            error: Failure reason (None on success)
+            elapsed: Seconds spent on the target, connection included
+        """
+        self.target = target
+        self.interfaces = interfaces
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# ----------------------------------------------------------------------------
+# Inventories
+# ----------------------------------------------------------------------------
+
+def load_targets(path: str, group: Optional[str] = None, port: int = DEFAULT_PORT) -> List[GnmiTarget]:
+    """
+    Load the gNMI targets of an Ansible inventory or a pyATS testbed
+
+    The format is detected from the file content: a top-level 'devices'
+    mapping is a pyATS testbed, anything else an Ansible YAML inventory.
+
+    Args:
+        path: inventory.yml or testbed.yaml
+        group: Ansible group to restrict the targets to
+        port: gNMI port used when the inventory does not give one
+    """
+    data = _load_yaml(Path(path)) or {}
+    if isinstance(data.get('devices'), dict):
+        return load_pyats_testbed(path, port=port)
+    return load_ansible_inventory(path, group=group, port=port)
+
+
+def load_ansible_inventory(path: str, group: Optional[str] = None, port: int = DEFAULT_PORT) -> List[GnmiTarget]:
+    """
+    Load the gNMI targets of an Ansible YAML inventory
+
+    Variables are resolved like Ansible does for the connection variables used
+    by the gnmi_get / gnmi_set modules: group vars from the inventory and from
+    group_vars/<group>.yml, then host vars from the inventory and from
+    host_vars/<host>.yml (later sources win). ansible_host, ansible_port,
+    ansible_user and ansible_password give the target.
+
+    Args:
+        path: Inventory file (group_vars and host_vars are looked up next to it)
+        group: Only return the hosts of this group (default: all hosts)
+        port: gNMI port used for hosts without ansible_port
+    """
+    path = Path(path)
+    data = _load_yaml(path) or {}
+    root = data['all'] if 'all' in data else {'children': data}
+    hosts = {}
+
+    def walk(name: str, node: Dict[str, Any], inherited: Dict[str, Any], selected: bool) -> None:
+        node = node or {}
+        variables = {**inherited, **(node.get('vars') or {}), **_vars_file(path.parent / 'group_vars', name)}
+        selected = selected or name == group
+        for host, host_vars in (node.get('hosts') or {}).items():
+            if selected:
+                merged = {**hosts.get(host, {}), **variables, **(host_vars or {})}
+                hosts[host] = merged
+        for child, child_node in (node.get('children') or {}).items():
+            walk(child, child_node, variables, selected)
+
+    walk('all', root, {}, group is None)
+
+    targets = []
+    for host, variables in hosts.items():
+        variables.update(_vars_file(path.parent / 'host_vars', host))
+        targets.append(GnmiTarget(
+            name=host,
+            host=variables.get('ansible_host', host),
+            port=variables.get('ansible_port', port),
+            username=variables.get('ansible_user', ''),
+            password=variables.get('ansible_password', '')
+        ))
+    return targets
+
+
+def load_pyats_testbed(path: str, port: int = DEFAULT_PORT) -> List[GnmiTarget]:
+    """
+    Load the gNMI targets of a pyATS testbed
+
+    A connection named 'gnmi' (or with protocol: gnmi) gives the address and
+    port. Devices without one (CLI-only devices) are skipped and reported.
+    Credentials come from credentials.default of the device, or of the testbed.
+
+    Args:
+        path: testbed.yaml
+        port: gNMI port used when the gNMI connection does not give one
+    """
+    data = _load_yaml(Path(path)) or {}
+    testbed_credentials = ((data.get('testbed') or {}).get('credentials') or {}).get('default') or {}
+    targets = []
+
+    for name, device in (data.get('devices') or {}).items():
+        device = device or {}
+        connections = device.get('connections') or {}
+        connection = connections.get('gnmi') or next(
+            (c for c in connections.values() if isinstance(c, dict) and c.get('protocol') == 'gnmi'), None)
+        host = connection.get('ip') or connection.get('host') if connection else None
+        if not host:
+            print(f"⚠️  Skipping {name}: no gNMI connection in {path}")
+            continue
+
+        credentials = ((device.get('credentials') or {}).get('default')) or testbed_credentials
+        targets.append(GnmiTarget(
+            name=name,
+            host=str(host),
+            port=connection.get('port', port),
+            username=credentials.get('username', ''),
+            password=credentials.get('password', '')
+        ))
+    return targets
+
+
+def _load_yaml(path: Path) -> Any:
+    if not HAS_YAML:
+        raise RuntimeError("PyYAML is required to read inventories (pip install pyyaml)")
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def _vars_file(directory: Path, name: str) -> Dict[str, Any]:
+    for suffix in ('.yml', '.yaml'):
+        candidate = directory / f"{name}{suffix}"
+        if candidate.is_file():
+            return _load_yaml(candidate) or {}
+    return {}
+
+
+# ----------------------------------------------------------------------------
+# OpenConfig parsing
+# ----------------------------------------------------------------------------
+
+def parse_openconfig_interfaces(response: Dict[str, Any], device: str = '',
+                                config_first: bool = False) -> List[Interface]:
+    """
+    Normalise an OpenConfig gNMI Get reply into Interface records
+
+    Accepts the replies of both interfaces/interface (one interface per
+    update) and /interfaces (the whole interface list in one update).
+
+    Args:
+        response: gNMI Get reply as returned by pygnmi
+        device: Device name stored in the records
+        config_first: Use the audit rules of parse_openconfig_interface
+    """
+    interfaces = []
+    if not response or 'notification' not in response:
+        return interfaces
+
+    for notification in response['notification']:
+        for update in notification.get('update', []):
+            val = update.get('val')
+            if not isinstance(val, dict):
+                continue
+            container = val.get('openconfig-interfaces:interfaces', val.get('interfaces', val))
+            entries = container.get('openconfig-interfaces:interface', container.get('interface'))
+            if entries is None:
+                entries = [val] if 'name' in val or 'config' in val else []
+            interfaces.extend(parse_openconfig_interface(entry, device, config_first) for entry in entries)
+
+    return interfaces
+
+
+def parse_openconfig_interface(interface: Dict[str, Any], device: str = '',
+                               config_first: bool = False) -> Interface:
+    """
+    Normalise one OpenConfig interface entry
+
+    By default state is read before config (the operational view shown by the
+    week-02 tools). With config_first, config is read before state and a
+    missing oper-status is 'UNKNOWN': the rules the week-03 audits compare
+    the expected interfaces with.
+    """
+    state = interface.get('state', {})
+    config = interface.get('config', {})
+
+    if config_first:
+        name_default = 'Unknown'
+        description = config.get('description', state.get('description', ''))
+        enabled = config.get('enabled', state.get('enabled', False))
+        oper_status = state.get('oper-status', 'UNKNOWN')
+    else:
+        name_default = 'N/A'
+        description = state.get('description', '') or config.get('description', '')
+        enabled = state.get('enabled', config.get('enabled', False))
+        oper_status = state.get('oper-status', '')
+
+    # First IPv4 address of the subinterfaces
+    ip_text = 'N/A'
+    for subif in interface.get('subinterfaces', {}).get('subinterface', []):
+        ipv4 = subif.get('openconfig-if-ip:ipv4', {}) or subif.get('ipv4', {})
+        addresses = ipv4.get('addresses', {}).get('address', [])
+        if addresses:
+            addr = addresses[0]
+            ip = addr.get('ip', '')
+            prefix_len = addr.get('state', {}).get('prefix-length', '') or addr.get('config', {}).get('prefix-length', '')
+            if ip and prefix_len:
+                ip_text = f"{ip}/{prefix_len}"
+            break
+
+    return Interface(
+        name=interface.get('name', config.get('name', name_default)),
+        type=config.get('type', state.get('type', '')),
+        ip_address=ip_text,
+        description=description,
+        admin_status='UP' if enabled else 'DOWN',
+        oper_status=oper_status,
+        vendor='openconfig',
+        device=device
+    )
+
+
+# ----------------------------------------------------------------------------
+# Collection
+# ----------------------------------------------------------------------------
+
+class _Job:
+    """Book-keeping of one target while its Get runs on the pool"""
+
+    __slots__ = ('target', 'started', 'connection', 'expired')
+
+    def __init__(self, target: GnmiTarget):
+        self.target = target
+        self.started = None
+        self.connection = None
+        self.expired = False
+
+
+def collect_interfaces(targets: Iterable[GnmiTarget], workers: int = DEFAULT_WORKERS,
+                       timeout: float = DEFAULT_TIMEOUT, path: str = OC_INTERFACES_PATH) -> Iterator[CollectResult]:
+    """
+    Get the interfaces of many targets concurrently
+
+    Args:
+        targets: Targets to query
+        workers: Maximum number of targets queried at the same time
+        timeout: Deadline of each target in seconds, from the moment a worker
+                 picks it up (connection and Get included)
+        path: OpenConfig path requested from every target
+
+    Yields:
+        One CollectResult per target, in completion order
+    """
+    if not HAS_PYGNMI:
+        raise RuntimeError("pygnmi is required to collect interfaces (pip install pygnmi)")
+
+    jobs = [_Job(target) for target in targets]
+    if not jobs:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs))), thread_name_prefix='gnmi')
+    pending = {executor.submit(_get_interfaces, job, path, timeout): job for job in jobs}
+
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                yield future.result()
+
+            now = time.monotonic()
+            for future, job in list(pending.items()):
+                if job.started is None or now - job.started <= timeout:
+                    continue
+                if not job.expired:
+                    # Closing the channel cancels the outstanding RPC
+                    job.expired = True
+                    _close_quietly(job.connection)
+                elif now - job.started > timeout + DEADLINE_GRACE:
+                    # The worker is stuck outside gRPC: report the target and move on
+                    pending.pop(future)
+                    yield CollectResult(job.target, error=f"deadline of {timeout:g}s exceeded",
+                                        elapsed=now - job.started)
+    finally:
+        for job in pending.values():
+            job.expired = True
+            _close_quietly(job.connection)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_interfaces(job: _Job, path: str, timeout: float) -> CollectResult:
+    target = job.target
+    job.started = time.monotonic()
+    try:
+        job.connection = gNMIclient(
+            target=(target.host, target.port),
+            username=target.username,
+            password=target.password,
+            insecure=target.insecure
+        )
+        job.connection.connect()
+        response = job.connection.get(path=[path], encoding='json_ietf')
+        interfaces = parse_openconfig_interfaces(response, device=target.name)
+        return CollectResult(target, interfaces, elapsed=time.monotonic() - job.started)
+    except Exception as e:
+        error = f"deadline of {timeout:g}s exceeded" if job.expired else str(e) or type(e).__name__
+        return CollectResult(target, error=error, elapsed=time.monotonic() - job.started)
+    finally:
+        _close_quietly(job.connection)
+
+
+def _close_quietly(connection: Any) -> None:
+    if connection is None:
+        return
+    try:
+        connection.close()
+    except Exception:
+        pass
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+gNMI Audit Metrics
+==================
+Per-device timing of the phases of a gNMI audit (connect, Get RPC, parse,
+compare) and the size of the replies, recorded by the week-03 Robot library
+and written as JSON or as Prometheus text exposition format, so audit
+latency can be trended per device and slow targets spotted across runs.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+PHASES = ['connect', 'get', 'parse', 'compare']
+PROMETHEUS_SUFFIXES = ('.prom', '.txt')
+
+
+class PhaseStats:
+    """Count, total, maximum and last duration of one phase of one device"""
+
+    __slots__ = ('count', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'max_seconds': round(self.max, 6),
+            'last_seconds': round(self.last, 6)
+        }
+
+
+class GnmiMetrics:
+    """Thread-safe recorder of phase timings and payload sizes per device"""
+
+    def __init__(self, scope: str = ''):
+        """
+        Args:
+            scope: Label of the recorder (e.g. the Robot suite name)
+        """
+        self.scope = scope
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._phases: Dict[str, Dict[str, PhaseStats]] = {}
+        self._payload_bytes: Dict[str, int] = {}
+
+    def record(self, device: str, phase: str, seconds: float) -> None:
+        """Record one duration of a phase"""
+        with self._lock:
+            self._phases.setdefault(device, {}).setdefault(phase, PhaseStats()).add(seconds)
+
+    @contextmanager
+    def timer(self, device: str, phase: str) -> Iterator[None]:
+        """Time the enclosed block as one occurrence of a phase (failures included)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(device, phase, time.perf_counter() - start)
+
+    def add_payload(self, device: str, size: int) -> None:
+        """Add the size in bytes of a reply received from a device"""
+        with self._lock:
+            self._payload_bytes[device] = self._payload_bytes.get(device, 0) + size
+
+    def __bool__(self) -> bool:
+        with self._lock:
+            return bool(self._phases)
+
+    def phase(self, device: str, phase: str) -> PhaseStats:
+        with self._lock:
+            return self._phases.get(device, {}).get(phase) or PhaseStats()
+
+    def devices(self) -> List[str]:
+        with self._lock:
+            return sorted(set(self._phases) | set(self._payload_bytes))
+
+    def payload_bytes(self, device: str) -> int:
+        with self._lock:
+            return self._payload_bytes.get(device, 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as {'scope', 'started', 'devices': {device: {phase: stats, 'payload_bytes'}}}"""
+        with self._lock:
+            devices = {}
+            for device in sorted(set(self._phases) | set(self._payload_bytes)):
+                entry = {phase: stats.as_dict() for phase, stats in self._phases.get(device, {}).items()}
+                entry['payload_bytes'] = self._payload_bytes.get(device, 0)
+                devices[device] = entry
+        return {'scope': self.scope, 'started': self.started, 'devices': devices}
+
+    def summary(self) -> Dict[str, str]:
+        """Return a few human-readable figures (slowest Get, total payload if measured, phase totals)"""
+        devices = self.devices()
+        if not devices:
+            return {}
+        summary = {'gNMI Devices': str(len(devices))}
+        payload = sum(self.payload_bytes(device) for device in devices)
+        if payload:
+            summary['gNMI Payload'] = _human_bytes(payload)
+        slowest = max(devices, key=lambda device: self.phase(device, 'get').max)
+        if self.phase(slowest, 'get').count:
+            summary['gNMI Slowest Get'] = f"{_human_seconds(self.phase(slowest, 'get').max)} ({slowest})"
+        for phase in PHASES:
+            total = sum(self.phase(device, phase).total for device in devices)
+            if total:
+                summary[f"gNMI {phase.capitalize()} Time"] = _human_seconds(total)
+        return summary
+
+
+def prometheus_text(recorders: Iterable[GnmiMetrics]) -> str:
+    """Render recorders in Prometheus text exposition format (one label set per scope, device and phase)"""
+    lines = [
+        '# HELP gnmi_audit_phase_seconds Time spent in each phase of the gNMI audit',
+        '# TYPE gnmi_audit_phase_seconds summary'
+    ]
+    max_lines = [
+        '# HELP gnmi_audit_phase_max_seconds Longest single occurrence of each phase',
+        '# TYPE gnmi_audit_phase_max_seconds gauge'
+    ]
+    payload_lines = [
+        '# HELP gnmi_audit_payload_bytes_total Size of the gNMI replies received (JSON-encoded)',
+        '# TYPE gnmi_audit_payload_bytes_total counter'
+    ]
+    started_lines = [
+        '# HELP gnmi_audit_start_time_seconds Unix time the audit started',
+        '# TYPE gnmi_audit_start_time_seconds gauge'
+    ]
+
+    for recorder in recorders:
+        data = recorder.as_dict()
+        scope = _label(data['scope'])
+        started_lines.append(f'gnmi_audit_start_time_seconds{{scope="{scope}"}} {data["started"]:.3f}')
+        for device, entry in data['devices'].items():
+            labels = f'scope="{scope}",device="{_label(device)}"'
+            for phase in PHASES:
+                stats = entry.get(phase)
+                if stats is None:
+                    continue
+                phase_labels = f'{labels},phase="{phase}"'
+                lines.append(f'gnmi_audit_phase_seconds_sum{{{phase_labels}}} {stats["total_seconds"]}')
+                lines.append(f'gnmi_audit_phase_seconds_count{{{phase_labels}}} {stats["count"]}')
+                max_lines.append(f'gnmi_audit_phase_max_seconds{{{phase_labels}}} {stats["max_seconds"]}')
+            payload_lines.append(f'gnmi_audit_payload_bytes_total{{{labels}}} {entry["payload_bytes"]}')
+
+    return '\n'.join(lines + max_lines + payload_lines + started_lines) + '\n'
+
+
+def write_metrics(path: str, recorders: Iterable[GnmiMetrics]) -> str:
+    """
+    Write recorders to a file (atomic replace)
+
+    Files ending in .prom or .txt get Prometheus text format (e.g. for the
+    node_exporter textfile collector), anything else JSON. The content is
+    written to a unique temporary file first, so concurrent writers never
+    mix their output.
+
+    Returns:
+        Path of the written file
+    """
+    recorders = list(recorders)
+    path = Path(path)
+    if path.suffix.lower() in PROMETHEUS_SUFFIXES:
+        payload = prometheus_text(recorders)
+    else:
+        payload = json.dumps({'written': time.time(), 'scopes': [r.as_dict() for r in recorders]}, indent=2)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_name = None
+    try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent,
+                                         prefix=f".{path.name}.", suffix='.tmp', delete=False) as f:
+            tmp_name = f.name
+            f.write(payload)
+        os.replace(tmp_name, path)
+    except OSError:
+        if tmp_name:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+        raise
+    return str(path)
+
+
+def _label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _human_seconds(seconds: float) -> str:
+    return f"{seconds:.3f} s" if seconds >= 1 else f"{seconds * 1000:.1f} ms"
+
+
+def _human_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
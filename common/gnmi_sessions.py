@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Shared gNMI Session Manager
+===========================
+Process-wide pool of open gNMI channels, one per device, shared by every
+user in the process (e.g. the GnmiLibrary instances of several Robot suites).
+
+- Channels to many devices are opened concurrently and Gets run in parallel,
+  one RPC at a time per channel.
+- Channels are reference counted: a device is disconnected when its last
+  user releases it.
+- gRPC channels cannot cross a fork, so a process forked from the one that
+  opened them (pabot workers, multiprocessing) starts with an empty pool and
+  opens its own channels instead of reusing inherited ones.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from gnmi_collector import DEFAULT_TIMEOUT, DEFAULT_WORKERS, GnmiTarget
+from gnmi_metrics import GnmiMetrics
+
+try:
+    from pygnmi.client import gNMIclient
+    HAS_PYGNMI = True
+except ImportError:
+    HAS_PYGNMI = False
+
+
+class _Session:
+    """Open channel of one device, its RPC lock and its user count"""
+
+    __slots__ = ('target', 'connection', 'lock', 'users')
+
+    def __init__(self, target: GnmiTarget, connection: Any):
+        self.target = target
+        self.connection = connection
+        self.lock = threading.Lock()
+        self.users = 1
+
+
+class GnmiSessionManager:
+    """Thread-safe, fork-aware pool of gNMI channels keyed by device name"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            timeout: Seconds allowed to open a channel
+        """
+        if not HAS_PYGNMI:
+            raise RuntimeError("pygnmi is required for gNMI sessions (pip install pygnmi)")
+        self.timeout = timeout
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, _Session] = {}
+
+    def connect(self, target: GnmiTarget, metrics: Optional[GnmiMetrics] = None) -> Any:
+        """
+        Return the open channel of a device, connecting it if needed
+
+        Every call must be paired with a release() of the device.
+
+        Args:
+            target: Device to connect
+            metrics: Records the channel setup time as the 'connect' phase
+
+        Raises:
+            Exception: The channel could not be opened
+        """
+        self._check_fork()
+        with self._lock:
+            session = self._sessions.get(target.name)
+            if session is not None:
+                session.users += 1
+                return session.connection
+
+        start = time.perf_counter()
+        try:
+            connection = gNMIclient(
+                target=(target.host, target.port),
+                username=target.username,
+                password=target.password,
+                insecure=target.insecure,
+                skip_verify=target.insecure,
+                gnmi_timeout=self.timeout
+            )
+            connection.connect()
+        finally:
+            if metrics is not None:
+                metrics.record(target.name, 'connect', time.perf_counter() - start)
+
+        with self._lock:
+            session = self._sessions.get(target.name)
+            if session is None:
+                self._sessions[target.name] = _Session(target, connection)
+                return connection
+            # Another thread connected the device meanwhile: use its channel
+            session.users += 1
+        _close_quietly(connection)
+        return session.connection
+
+    def connect_all(self, targets: Iterable[GnmiTarget], workers: int = DEFAULT_WORKERS,
+                    metrics: Optional[GnmiMetrics] = None) -> Dict[str, Optional[str]]:
+        """
+        Connect many devices concurrently
+
+        Returns:
+            Device name -> None when connected, or the error message
+        """
+        targets = list(targets)
+        if not targets:
+            return {}
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(targets)))) as executor:
+            futures = {executor.submit(self.connect, target, metrics): target.name for target in targets}
+            for future in as_completed(futures):
+                error = future.exception()
+                results[futures[future]] = None if error is None else (str(error) or type(error).__name__)
+        return results
+
+    def connection(self, name: str) -> Optional[Any]:
+        """Return the open channel of a device (None if not connected)"""
+        self._check_fork()
+        with self._lock:
+            session = self._sessions.get(name)
+        return session.connection if session is not None else None
+
+    def call(self, name: str, method: str, metrics: Optional[GnmiMetrics] = None, **kwargs: Any) -> Any:
+        """
+        Run one RPC (get, set, capabilities...) on the channel of a device
+
+        Args:
+            metrics: Records the RPC latency as the phase named after the method
+        """
+        self._check_fork()
+        with self._lock:
+            session = self._sessions.get(name)
+        if session is None:
+            raise KeyError(f"Device {name} is not connected")
+        with session.lock:
+            if metrics is None:
+                return getattr(session.connection, method)(**kwargs)
+            with metrics.timer(name, method):
+                return getattr(session.connection, method)(**kwargs)
+
+    def get_many(self, names: Iterable[str], path: str, encoding: str = 'json_ietf',
+                 workers: int = DEFAULT_WORKERS,
+                 metrics: Optional[GnmiMetrics] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """
+        Run the same Get on many connected devices in parallel
+
+        Yields:
+            (device name, Get reply or None, error message or None), in completion order
+        """
+        names = list(names)
+        if not names:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as executor:
+            futures = {executor.submit(self.call, name, 'get', metrics, path=[path], encoding=encoding): name
+                       for name in names}
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    yield futures[future], future.result(), None
+                else:
+                    yield futures[future], None, str(error) or type(error).__name__
+
+    def release(self, name: str) -> None:
+        """Give back a device obtained with connect(); the last user closes its channel"""
+        self._check_fork()
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                return
+            session.users -= 1
+            if session.users > 0:
+                return
+            del self._sessions[name]
+        with session.lock:
+            _close_quietly(session.connection)
+
+    def close_all(self) -> None:
+        """Close every channel regardless of its users"""
+        self._check_fork()
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            _close_quietly(session.connection)
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            # Forked child: the inherited channels belong to the parent
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._sessions = {}
+
+
+_shared_manager = None
+_shared_lock = threading.Lock()
+
+
+def shared_manager() -> GnmiSessionManager:
+    """Return the session manager shared by the whole process"""
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = GnmiSessionManager()
+        return _shared_manager
+
+
+def _close_quietly(connection: Any) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
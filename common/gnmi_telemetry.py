@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+gNMI Streaming Interface Telemetry
+==================================
+Keeps an in-memory interface state table per device, fed by gNMI Subscribe
+(STREAM mode, ON_CHANGE or SAMPLE) instead of polling the whole OpenConfig
+interfaces tree with Get.
+
+The device sends the full state once (up to sync_response) and then only the
+leaves that change. InterfaceStateTable applies every update to a per-device
+OpenConfig tree and re-normalises only the interfaces it touched, so reading
+the table (interfaces(), get()) costs no device round trip at all.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from gnmi_collector import GnmiTarget, parse_openconfig_interface
+from interface_model import Interface
+
+try:
+    from pygnmi.client import gNMIclient, telemetryParser
+    HAS_PYGNMI = True
+except ImportError:
+    HAS_PYGNMI = False
+
+
+OC_INTERFACE_PREFIX = 'openconfig-interfaces:interfaces/interface'
+
+# Leaves the Interface record is built from; counters are left out on purpose
+SUBSCRIPTION_PATHS = [
+    f'{OC_INTERFACE_PREFIX}/config',
+    f'{OC_INTERFACE_PREFIX}/state/oper-status',
+    f'{OC_INTERFACE_PREFIX}/state/admin-status',
+    f'{OC_INTERFACE_PREFIX}/state/enabled',
+    f'{OC_INTERFACE_PREFIX}/state/description',
+    f'{OC_INTERFACE_PREFIX}/subinterfaces/subinterface/openconfig-if-ip:ipv4/addresses'
+]
+
+SUBSCRIPTION_MODES = ['on_change', 'sample']
+DEFAULT_SAMPLE_INTERVAL = 10.0
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+# Key leaves of the OpenConfig lists found under an interface
+LIST_KEYS = ('name', 'index', 'ip')
+
+
+class _KeyedList(dict):
+    """YANG list of the state tree (key value -> entry), rendered as a JSON list"""
+
+
+class InterfaceStateTable:
+    """Thread-safe interface state of several devices, updated incrementally"""
+
+    def __init__(self, on_change: Optional[Callable[[str, str, Optional[Interface]], None]] = None):
+        """
+        Args:
+            on_change: Called with (device, interface name, new record or None
+                       when the interface was deleted) after every change
+        """
+        self.on_change = on_change
+        self._lock = threading.Condition()
+        self._trees: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._records: Dict[str, Dict[str, Interface]] = {}
+        self._synced: Set[str] = set()
+        self.updated_at: Dict[str, float] = {}
+
+    def apply(self, device: str, message: Dict[str, Any]) -> Set[str]:
+        """
+        Apply one parsed SubscribeResponse (pygnmi telemetryParser format)
+
+        Args:
+            device: Device the message came from
+            message: {'update': {'prefix', 'update': [...], 'delete': [...]}}
+                     or {'sync_response': True}
+
+        Returns:
+            Names of the interfaces changed by the message
+        """
+        if message.get('sync_response'):
+            with self._lock:
+                self._synced.add(device)
+                self._lock.notify_all()
+            return set()
+
+        notification = message.get('update') or {}
+        prefix = _split_path(notification.get('prefix', ''))
+        changed = set()
+
+        with self._lock:
+            tree = self._trees.setdefault(device, {})
+            for delete in notification.get('delete', []):
+                path = prefix + _split_path(delete.get('path', '') if isinstance(delete, dict) else delete)
+                changed |= _delete(tree, path)
+            for update in notification.get('update', []):
+                path = prefix + _split_path(update.get('path', ''))
+                changed |= _update(tree, path, update.get('val'))
+
+            records = self._records.setdefault(device, {})
+            for name in changed:
+                if name in tree:
+                    records[name] = parse_openconfig_interface(_render(tree[name]), device)
+                else:
+                    records.pop(name, None)
+            if changed:
+                self.updated_at[device] = time.time()
+            self._lock.notify_all()
+
+        if self.on_change is not None:
+            for name in sorted(changed):
+                self.on_change(device, name, records.get(name))
+        return changed
+
+    def get(self, device: str, name: str) -> Optional[Interface]:
+        """Return the current record of one interface"""
+        with self._lock:
+            return self._records.get(device, {}).get(name)
+
+    def interfaces(self, device: Optional[str] = None) -> List[Interface]:
+        """Return the current records of one device (default: all devices), sorted by device and name"""
+        with self._lock:
+            devices = [device] if device is not None else sorted(self._records)
+            return [self._records[d][name] for d in devices if d in self._records for name in sorted(self._records[d])]
+
+    def devices(self) -> List[str]:
+        with self._lock:
+            return sorted(self._records)
+
+    def is_synced(self, device: str) -> bool:
+        """Tell whether the device has sent its initial full state"""
+        with self._lock:
+            return device in self._synced
+
+    def wait_for_sync(self, devices: Iterable[str], timeout: float) -> bool:
+        """Wait until every device has sent its initial full state; False on timeout"""
+        devices = set(devices)
+        with self._lock:
+            return self._lock.wait_for(lambda: devices <= self._synced, timeout)
+
+    def wait_for(self, predicate: Callable[['InterfaceStateTable'], bool], timeout: float) -> bool:
+        """Wait until predicate(table) is true, re-checking after every update; False on timeout"""
+        with self._lock:
+            return self._lock.wait_for(lambda: predicate(self), timeout)
+
+    def clear(self, device: str) -> None:
+        """Forget the state of a device (before a resubscription resends it)"""
+        with self._lock:
+            self._trees.pop(device, None)
+            self._records.pop(device, None)
+            self._synced.discard(device)
+
+
+class TelemetryCollector:
+    """Background gNMI subscriptions feeding an InterfaceStateTable, one stream per target"""
+
+    def __init__(self, targets: Iterable[GnmiTarget], table: Optional[InterfaceStateTable] = None,
+                 mode: str = 'on_change', sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 paths: Optional[List[str]] = None, log: Callable[[str], None] = print):
+        """
+        Args:
+            targets: Devices to subscribe to
+            table: State table to feed (default: a new one)
+            mode: 'on_change' (updates only when a leaf changes) or 'sample'
+            sample_interval: Seconds between samples in 'sample' mode
+            paths: Subscribed paths (default: SUBSCRIPTION_PATHS)
+            log: Receives connection and error messages
+        """
+        if not HAS_PYGNMI:
+            raise RuntimeError("pygnmi is required for streaming telemetry (pip install pygnmi)")
+        if mode not in SUBSCRIPTION_MODES:
+            raise ValueError(f"Unsupported subscription mode: {mode}")
+        self.targets = list(targets)
+        self.table = table or InterfaceStateTable()
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.paths = paths or SUBSCRIPTION_PATHS
+        self.log = log
+        self._stop = threading.Event()
+        self._threads = []
+        self._streams = {}
+
+    def subscription(self) -> Dict[str, Any]:
+        """Return the pygnmi SubscriptionList of the collector"""
+        entries = []
+        for path in self.paths:
+            entry = {'path': path, 'mode': self.mode}
+            if self.mode == 'sample':
+                entry['sample_interval'] = int(self.sample_interval * 1e9)
+            entries.append(entry)
+        return {'subscription': entries, 'mode': 'stream', 'encoding': 'json_ietf'}
+
+    def start(self) -> 'TelemetryCollector':
+        """Open the subscription of every target in a background thread"""
+        self._stop.clear()
+        for target in self.targets:
+            thread = threading.Thread(target=self._run, args=(target,), name=f"gnmi-sub-{target.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel every subscription and wait for the threads to exit"""
+        self._stop.set()
+        for stream in list(self._streams.values()):
+            _cancel_quietly(stream)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wait_for_sync(self, timeout: float) -> bool:
+        """Wait until every target has sent its initial full state"""
+        return self.table.wait_for_sync([target.name for target in self.targets], timeout)
+
+    def _run(self, target: GnmiTarget) -> None:
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = gNMIclient(
+                    target=(target.host, target.port),
+                    username=target.username,
+                    password=target.password,
+                    insecure=target.insecure,
+                    skip_verify=target.insecure
+                )
+                connection.connect()
+                stream = connection.subscribe(subscribe=self.subscription())
+                self._streams[target.name] = stream
+                self.log(f"📡 Subscribed to {target.name} ({target.host}:{target.port}, {self.mode})")
+                # The device resends its full state after a resubscription
+                self.table.clear(target.name)
+                for response in stream:
+                    delay = RECONNECT_DELAY
+                    self.table.apply(target.name, telemetryParser(response))
+                    if self._stop.is_set():
+                        break
+            except Exception as e:
+                if not self._stop.is_set():
+                    self.log(f"⚠️  Subscription to {target.name} failed: {e} (retrying in {delay:g}s)")
+            finally:
+                self._streams.pop(target.name, None)
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+# ----------------------------------------------------------------------------
+# State tree
+# ----------------------------------------------------------------------------
+
+def _split_path(path: str) -> List[tuple]:
+    """
+    Split a pygnmi path string into (element, keys) pairs
+
+    Slashes inside [key=value] predicates (interface names) are kept, and
+    module prefixes are dropped: openconfig-interfaces:interfaces ->
+    interfaces.
+    """
+    elements = []
+    name, keys, key, value = '', {}, None, None
+    depth = 0
+    for char in path.strip('/') + '/':
+        if depth:
+            if char == ']':
+                depth = 0
+                keys[key] = value
+            elif char == '=' and value is None:
+                value = ''
+            elif value is None:
+                key += char
+            else:
+                value += char
+        elif char == '[':
+            depth, key, value = 1, '', None
+        elif char == '/':
+            if name:
+                elements.append((_strip_module(name), keys))
+            name, keys = '', {}
+        else:
+            name += char
+    return elements
+
+
+def _strip_module(name: str) -> str:
+    return name.split(':', 1)[-1]
+
+
+def _interface_path(tree_path: List[tuple]) -> Optional[tuple]:
+    """Return (interface name, path below the interface) for an interfaces/interface[name=X] path"""
+    if len(tree_path) >= 2 and tree_path[0][0] == 'interfaces' and tree_path[1][0] == 'interface':
+        name = tree_path[1][1].get('name')
+        if name is not None:
+            return name, tree_path[2:]
+    return None
+
+
+def _update(tree: Dict[str, Any], path: List[tuple], val: Any) -> Set[str]:
+    located = _interface_path(path)
+    if located is None:
+        # Update above the interface level: split the value per interface
+        if path and path[-1][0] == 'interfaces' and isinstance(val, dict):
+            val = _strip_keys(val).get('interface', [])
+        elif not (path and path[-1][0] == 'interface' and not path[-1][1]):
+            return set()
+        entries = val if isinstance(val, list) else [val]
+        changed = set()
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get('name') is not None:
+                changed |= _update(tree, [('interfaces', {}), ('interface', {'name': entry['name']})], entry)
+        return changed
+
+    name, below = located
+    node = tree.setdefault(name, {'name': name})
+    for element, keys in below[:-1] if below else []:
+        node = _child(node, element, keys)
+    val = _strip_keys(val)
+
+    if not below:
+        _merge(node, val)
+    elif below[-1][1]:
+        _merge(_child(node, *below[-1]), val)
+    elif isinstance(val, dict):
+        _merge(node.setdefault(below[-1][0], {}), val)
+    else:
+        node[below[-1][0]] = val
+    return {name}
+
+
+def _delete(tree: Dict[str, Any], path: List[tuple]) -> Set[str]:
+    located = _interface_path(path)
+    if located is None:
+        if path and path[-1][0] in ('interfaces', 'interface') and not path[-1][1]:
+            names = set(tree)
+            tree.clear()
+            return names
+        return set()
+
+    name, below = located
+    if name not in tree:
+        return set()
+    if not below:
+        del tree[name]
+        return {name}
+
+    node = tree[name]
+    for element, keys in below[:-1]:
+        node = node.get(element)
+        if isinstance(node, _KeyedList):
+            node = node.get(_list_key(keys))
+        if not isinstance(node, dict):
+            return set()
+    element, keys = below[-1]
+    if keys:
+        entries = node.get(element)
+        if isinstance(entries, _KeyedList):
+            entries.pop(_list_key(keys), None)
+    else:
+        node.pop(element, None)
+    return {name}
+
+
+def _child(node: Dict[str, Any], element: str, keys: Dict[str, str]) -> Dict[str, Any]:
+    if not keys:
+        return node.setdefault(element, {})
+    entries = node.get(element)
+    if not isinstance(entries, _KeyedList):
+        entries = node[element] = _KeyedList()
+    return entries.setdefault(_list_key(keys), dict(keys))
+
+
+def _list_key(keys: Dict[str, str]) -> str:
+    return '|'.join(str(keys[k]) for k in sorted(keys))
+
+
+def _merge(node: Dict[str, Any], val: Any) -> None:
+    """Merge a JSON value into a tree node, turning keyed JSON lists into _KeyedList"""
+    if not isinstance(val, dict):
+        return
+    for key, value in val.items():
+        if isinstance(value, list) and all(isinstance(v, dict) for v in value):
+            entries = node.get(key)
+            if not isinstance(entries, _KeyedList):
+                entries = node[key] = _KeyedList()
+            for entry in value:
+                list_key = next((k for k in LIST_KEYS if k in entry), None)
+                keys = {list_key: str(entry[list_key])} if list_key else {'': str(len(entries))}
+                _merge(entries.setdefault(_list_key(keys), {}), entry)
+        elif isinstance(value, dict):
+            _merge(node.setdefault(key, {}), value)
+        else:
+            node[key] = value
+
+
+def _strip_keys(val: Any) -> Any:
+    """Drop the module prefixes of JSON-IETF member names"""
+    if isinstance(val, dict):
+        return {_strip_module(k): _strip_keys(v) for k, v in val.items()}
+    if isinstance(val, list):
+        return [_strip_keys(v) for v in val]
+    return val
+
+
+def _render(node: Any) -> Any:
+    """Turn a state tree node back into OpenConfig JSON"""
+    if isinstance(node, _KeyedList):
+        return [_render(entry) for entry in node.values()]
+    if isinstance(node, dict):
+        return {key: _render(value) for key, value in node.items()}
+    return node
+
+
+def _cancel_quietly(stream: Any) -> None:
+    try:
+        stream.cancel()
+    except Exception:
+        pass
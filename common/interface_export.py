@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Interface Inventory Exporters
+=============================
+Streaming writers that dump Interface records to JSON, JSON Lines, CSV or
+Parquet files one row at a time, without building the whole document (or a
+text table) in memory first.
+
+Parquet output requires pyarrow; rows are flushed in row groups.
+
+Writers are context managers: leaving the block, even on an exception raised
+by the row source, flushes the rows written so far into a well-formed file
+and releases the file handle.
+"""
+
+import csv
+import json
+from typing import Iterable, Optional, TextIO
+
+from interface_model import Interface
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+EXPORT_FORMATS = ['json', 'jsonl', 'csv', 'parquet']
+FIELDS = list(Interface.__slots__)
+
+
+class InterfaceWriter:
+    """Base class of the streaming interface writers"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.closed = False
+
+    def write(self, interface: Interface) -> None:
+        raise NotImplementedError
+
+    def write_all(self, interfaces: Iterable[Interface]) -> None:
+        for interface in interfaces:
+            self.write(interface)
+
+    def close(self) -> None:
+        """Flush the rows written so far and release the file (idempotent)"""
+        if self.closed:
+            return
+        self.closed = True
+        self._close()
+
+    def _close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonLinesWriter(InterfaceWriter):
+    """One JSON object per line"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file: TextIO = open(path, 'w', encoding='utf-8')
+
+    def write(self, interface: Interface) -> None:
+        self._file.write(json.dumps(interface.as_dict()))
+        self._file.write('\n')
+        self.count += 1
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class JsonWriter(JsonLinesWriter):
+    """A single JSON array, written element by element"""
+
+    def write(self, interface: Interface) -> None:
+        self._file.write(',\n  ' if self.count else '[\n  ')
+        self._file.write(json.dumps(interface.as_dict()))
+        self.count += 1
+
+    def _close(self) -> None:
+        try:
+            self._file.write('\n]\n' if self.count else '[]\n')
+        finally:
+            super()._close()
+
+
+class CsvWriter(InterfaceWriter):
+    """CSV with a header row"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FIELDS)
+
+    def write(self, interface: Interface) -> None:
+        self._writer.writerow([getattr(interface, field) for field in FIELDS])
+        self.count += 1
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter(InterfaceWriter):
+    """Parquet file of string columns, flushed every batch_size rows"""
+
+    def __init__(self, path: str, batch_size: int = 10000):
+        if not HAS_PYARROW:
+            raise RuntimeError('pyarrow is required for Parquet output. Install with: pip install pyarrow')
+        super().__init__(path)
+        self.batch_size = batch_size
+        self._schema = pa.schema([(field, pa.string()) for field in FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._columns = {field: [] for field in FIELDS}
+
+    def write(self, interface: Interface) -> None:
+        for field in FIELDS:
+            value = getattr(interface, field)
+            self._columns[field].append(None if value is None else str(value))
+        self.count += 1
+        if len(self._columns['name']) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._columns['name']:
+            self._writer.write_table(pa.table(self._columns, schema=self._schema))
+            self._columns = {field: [] for field in FIELDS}
+
+    def _close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+WRITERS = {
+    'json': JsonWriter,
+    'jsonl': JsonLinesWriter,
+    'csv': CsvWriter,
+    'parquet': ParquetWriter
+}
+
+
+def open_writer(output_format: str, path: Optional[str] = None) -> InterfaceWriter:
+    """
+    Open a streaming writer for one of EXPORT_FORMATS.
+
+    Args:
+        output_format: One of 'json', 'jsonl', 'csv', 'parquet'
+        path: Output file (default: interfaces.<format>)
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {output_format}")
+    return WRITERS[output_format](path or f"interfaces.{output_format}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Shared Interface Model
+======================
+Compact, normalised interface record produced by the NSO query tool (week 1),
+the gNMI interface manager (week 2) and the Robot gNMI library (week 3).
+
+Instances use __slots__ instead of a per-row dict, and the low-cardinality
+fields (vendor, type and statuses) are interned so that hundreds of thousands
+of rows share the same string objects. Records are read-only mappings of
+their fields (interface['name'], interface.get('description', ''), items(),
+equality with the matching dict), so display code and Robot Framework's
+${interface}[name] syntax keep working. The json module only serialises real
+dicts: use as_dict(), or json.dumps(records, default=json_default).
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Interface(Mapping):
+    """Normalised interface record"""
+
+    __slots__ = (
+        'name',
+        'type',
+        'ip_address',
+        'description',
+        'status',
+        'admin_status',
+        'oper_status',
+        'vendor',
+        'device'
+    )
+
+    def __init__(self, name: str, type: str = '', ip_address: str = '', description: str = '',
+                 status: str = '', admin_status: str = '', oper_status: str = '',
+                 vendor: str = '', device: str = ''):
+        """
+        Args:
+            name: Full interface name (e.g. GigabitEthernet0/0/0/1)
+            type: Interface type as reported by the vendor model
+            ip_address: IP address(es) in display form
+            description: Interface description
+            status: Generic status (e.g. 'Configured', 'up')
+            admin_status: Administrative status ('UP' / 'DOWN')
+            oper_status: Operational status (e.g. 'UP', 'LOWER_LAYER_DOWN')
+            vendor: Vendor or data model family that produced the record
+            device: Device the interface belongs to
+        """
+        self.name = name
+        self.type = _intern(type)
+        self.ip_address = ip_address
+        self.description = description
+        self.status = _intern(status)
+        self.admin_status = _intern(admin_status)
+        self.oper_status = _intern(oper_status)
+        self.vendor = _intern(vendor)
+        self.device = _intern(device)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__ if getattr(self, field))
+        return f"Interface({fields})"
+
+
+def json_default(value: Any) -> Dict[str, Any]:
+    """default= hook of json.dump / json.dumps serialising Interface records as objects"""
+    if isinstance(value, Interface):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
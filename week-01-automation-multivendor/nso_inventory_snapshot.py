@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+NSO Inventory Snapshots
+=======================
+Stores a compact summary of the last interface inventory of an NSO server on
+disk and reports the differences of the current run against it (added,
+removed and changed interfaces per device).
+
+Per device, the snapshot keeps the platform, the validators (ETag /
+Last-Modified) of the interface response, a digest of the whole inventory and
+one fingerprint per interface: a short hash of each compared field, not the
+field values. A change therefore names the field and its new value only.
+"""
+
+import csv
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from nso_restconf_client import CACHE_DIR, JsonCacheFile
+
+
+DEFAULT_SNAPSHOT_FILE = CACHE_DIR / 'inventory.json'
+SNAPSHOT_VERSION = 2
+
+# Interface fields compared by the diff
+DIFF_FIELDS = ['type', 'ip_address', 'description', 'status', 'admin_status', 'oper_status']
+
+# Hex characters of the hash of one field in an interface fingerprint
+FIELD_HASH_LENGTH = 6
+
+CHANGE_COLUMNS = ['device', 'change', 'interface', 'field', 'new']
+
+
+def interface_fingerprint(interface: Any) -> str:
+    """Concatenated short hashes of the DIFF_FIELDS of an interface (a record or a dict)"""
+    return ''.join(
+        hashlib.blake2b(str(interface.get(field) or '').encode('utf-8'),
+                        digest_size=FIELD_HASH_LENGTH // 2).hexdigest()
+        for field in DIFF_FIELDS
+    )
+
+
+class DeviceInventory:
+    """Fingerprints of the interfaces of one device, built one row at a time"""
+
+    def __init__(self, device: str, previous: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            device: Device name
+            previous: Interface name -> fingerprint of the previous snapshot;
+                      changes are tracked only when given
+        """
+        self.device = device
+        self.previous = previous
+        self.interfaces: Dict[str, str] = {}
+        self.changes: List[Dict[str, str]] = []
+        self._digest = hashlib.blake2b(digest_size=8)
+
+    def add(self, interface: Any) -> None:
+        """Add one interface row, comparing it with the previous snapshot"""
+        fingerprint = interface_fingerprint(interface)
+        self.interfaces[interface['name']] = fingerprint
+        self._digest.update(f"{interface['name']}\t{fingerprint}\n".encode('utf-8'))
+        if self.previous is None:
+            return
+
+        old = self.previous.get(interface['name'])
+        if old is None:
+            self.changes.append(_change(self.device, 'added', interface['name']))
+        elif old != fingerprint:
+            for index, field in enumerate(DIFF_FIELDS):
+                chunk = slice(index * FIELD_HASH_LENGTH, (index + 1) * FIELD_HASH_LENGTH)
+                if old[chunk] != fingerprint[chunk]:
+                    self.changes.append(_change(self.device, 'changed', interface['name'], field,
+                                                new=interface.get(field) or ''))
+
+    @property
+    def digest(self) -> str:
+        """Digest of the interfaces added so far (names and fingerprints, in order)"""
+        return self._digest.hexdigest()
+
+    def removed(self) -> List[Dict[str, str]]:
+        """Change rows of the previous interfaces that were not added"""
+        return [_change(self.device, 'removed', name)
+                for name in (self.previous or {}) if name not in self.interfaces]
+
+
+def inventory_digest(interfaces: Iterable[Any]) -> str:
+    """Digest of a whole interface inventory, as remembered with the validators of its response"""
+    inventory = DeviceInventory('')
+    for interface in interfaces:
+        inventory.add(interface)
+    return inventory.digest
+
+
+class InventorySnapshot:
+    """JSON-file backed snapshot of the interface inventory of one NSO server"""
+
+    def __init__(self, path: Path, nso_url: str, track_changes: bool = False):
+        """
+        Args:
+            path: Snapshot file location (one file can hold several NSO servers)
+            nso_url: NSO base URL the inventory belongs to
+            track_changes: Collect the changes against the previous snapshot
+        """
+        self.path = Path(path)
+        self.nso_url = nso_url
+        self.track_changes = track_changes
+        self._file = JsonCacheFile(self.path, SNAPSHOT_VERSION, 'inventory snapshot')
+        self._lock = threading.Lock()
+        self._data = self._file.load({'inventories': {}})
+        self.previous = self._data.get('inventories', {}).get(nso_url, {}).get('devices', {})
+        self.current = {}
+        self._changes: List[Dict[str, str]] = []
+
+    def get(self, device: str) -> Optional[Dict[str, Any]]:
+        """Return the previous snapshot entry of a device (platform, validators, digest, fingerprints)"""
+        return self.previous.get(device)
+
+    def begin(self, device: str) -> DeviceInventory:
+        """Start the inventory of a device for this run; feed it with add(), then record() it"""
+        previous = None
+        if self.track_changes:
+            previous = self.previous.get(device, {}).get('interfaces', {})
+        return DeviceInventory(device, previous)
+
+    def record(self, device: str, platform: str, inventory: DeviceInventory,
+               etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Record the current inventory of a device and the validators it was fetched with"""
+        changes = inventory.changes + inventory.removed() if self.track_changes else []
+        with self._lock:
+            self.current[device] = {
+                'platform': platform,
+                'etag': etag,
+                'last_modified': last_modified,
+                'digest': inventory.digest,
+                'count': len(inventory.interfaces),
+                'interfaces': inventory.interfaces
+            }
+            self._changes.extend(changes)
+
+    def keep(self, device: str) -> None:
+        """Keep the previous entry of a device whose inventory did not change"""
+        with self._lock:
+            if device in self.previous:
+                self.current[device] = self.previous[device]
+
+    def carry_over(self, devices: List[str]) -> None:
+        """Keep the previous entry of devices that could not be queried this run"""
+        with self._lock:
+            for device in devices:
+                if device not in self.current and device in self.previous:
+                    self.current[device] = self.previous[device]
+
+    def changes(self) -> List[Dict[str, str]]:
+        """
+        Return the changes since the previous snapshot (track_changes only),
+        including the interfaces of devices no longer in the inventory, with
+        the keys of CHANGE_COLUMNS, ordered by device then interface
+        """
+        with self._lock:
+            changes = list(self._changes)
+            for device, entry in self.previous.items():
+                if device not in self.current:
+                    changes.extend(_change(device, 'removed', name) for name in entry.get('interfaces', {}))
+        return sorted(changes, key=lambda change: (change['device'], change['interface']))
+
+    def save(self) -> None:
+        """Replace the stored inventory of this NSO server with the current one (atomic write)"""
+        with self._lock:
+            self._data.setdefault('inventories', {})[self.nso_url] = {
+                'taken_at': time.time(),
+                'devices': self.current
+            }
+            payload = self._file.dumps(self._data)
+        self._file.write(payload)
+
+
+def _change(device: str, change: str, interface: str, field: str = '', new: Any = '') -> Dict[str, str]:
+    return {
+        'device': device,
+        'change': change,
+        'interface': interface,
+        'field': field,
+        'new': new
+    }
+
+
+def export_changes(changes: List[Dict[str, str]], output_format: str, path: Optional[str] = None) -> str:
+    """
+    Write diff rows to a json, jsonl or csv file.
+
+    Returns:
+        Path of the written file
+    """
+    path = path or f"interfaces_diff.{output_format}"
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if output_format == 'json':
+            json.dump(changes, f, indent=2)
+        elif output_format == 'jsonl':
+            for change in changes:
+                f.write(json.dumps(change) + '\n')
+        elif output_format == 'csv':
+            writer = csv.DictWriter(f, fieldnames=CHANGE_COLUMNS)
+            writer.writeheader()
+            writer.writerows(changes)
+        else:
+            raise ValueError(f"Unsupported diff export format: {output_format}")
+    return path
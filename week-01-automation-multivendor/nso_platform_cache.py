@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+NSO Platform Cache
+==================
+Persistent on-disk cache of device platforms (connection type and ned-id),
+keyed by NSO URL and device name, so repeated runs can skip discovery.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from nso_restconf_client import CACHE_DIR, JsonCacheFile
+
+
+DEFAULT_CACHE_FILE = CACHE_DIR / 'platforms.json'
+CACHE_VERSION = 1
+
+
+class PlatformCache:
+    """JSON-file backed cache of device -> (connection_type, ned-id) for one NSO server"""
+
+    def __init__(self, path: Path, nso_url: str, ttl: float):
+        """
+        Args:
+            path: Cache file location
+            nso_url: NSO base URL the cached entries belong to
+            ttl: Entry lifetime in seconds
+        """
+        self.path = Path(path)
+        self.nso_url = nso_url
+        self.ttl = ttl
+        self._file = JsonCacheFile(self.path, CACHE_VERSION, 'platform cache', indent=1)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._file.load({'entries': {}}).get('entries', {})
+        self._dirty = False
+
+    def _key(self, device: str) -> str:
+        return f"{self.nso_url}|{device}"
+
+    def get(self, device: str) -> Optional[Tuple[str, str]]:
+        """Return the cached (connection_type, ned-id) of a device if still fresh"""
+        with self._lock:
+            entry = self._entries.get(self._key(device))
+        if not entry or time.time() - entry.get('updated', 0) > self.ttl:
+            return None
+        return entry['connection_type'], entry['ned_id']
+
+    def lookup(self, devices: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        """Return the fresh cached platforms for the given devices"""
+        platforms = {}
+        for device in devices:
+            platform = self.get(device)
+            if platform:
+                platforms[device] = platform
+        return platforms
+
+    def set(self, device: str, connection_type: str, ned_id: str) -> None:
+        with self._lock:
+            self._entries[self._key(device)] = {
+                'connection_type': connection_type,
+                'ned_id': ned_id,
+                'updated': time.time()
+            }
+            self._dirty = True
+
+    def invalidate(self, device: str) -> None:
+        with self._lock:
+            if self._entries.pop(self._key(device), None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk if it changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = self._file.dumps({'entries': self._entries})
+            self._dirty = False
+        self._file.write(payload)
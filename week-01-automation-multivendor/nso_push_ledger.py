@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+NSO Push Ledger
+===============
+Persistent on-disk record of the configuration payloads successfully pushed
+to each device (payload hash -> device -> last push and NSO transaction id),
+so re-running a rollout can skip the payloads a device already received.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from nso_restconf_client import CACHE_DIR, JsonCacheFile
+
+
+DEFAULT_LEDGER_FILE = CACHE_DIR / 'push-ledger.json'
+LEDGER_VERSION = 1
+
+
+class PushLedger:
+    """JSON-file backed ledger of the payloads pushed through one NSO server"""
+
+    def __init__(self, path: Path, nso_url: str):
+        """
+        Args:
+            path: Ledger file location (one file can hold several NSO servers)
+            nso_url: NSO base URL the pushes went through
+        """
+        self.path = Path(path)
+        self.nso_url = nso_url
+        self.run_id = time.time()
+        self._file = JsonCacheFile(self.path, LEDGER_VERSION, 'push ledger', indent=1)
+        self._lock = threading.Lock()
+        self._data = self._file.load({'servers': {}})
+        server = self._data['servers'].setdefault(nso_url, {})
+        self._payloads = server.setdefault('payloads', {})
+        self._devices = server.setdefault('devices', {})
+        self._dirty = False
+
+    def get(self, device: str, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the last successful push of a payload to a device"""
+        with self._lock:
+            return self._payloads.get(digest, {}).get(device)
+
+    def is_current(self, device: str, digest: str) -> bool:
+        """
+        Tell whether a payload is already on a device
+
+        True when the payload was pushed successfully to the device and no run
+        pushed anything else to that device afterwards (a later push may have
+        overwritten it).
+        """
+        entry = self.get(device, digest)
+        with self._lock:
+            return entry is not None and entry.get('run') == self._devices.get(device)
+
+    def record(self, device: str, digest: str, source: str, transaction: Optional[str] = None) -> None:
+        """Record a successful push of a payload to a device"""
+        with self._lock:
+            self._payloads.setdefault(digest, {})[device] = {
+                'source': source,
+                'pushed_at': time.time(),
+                'transaction': transaction,
+                'run': self.run_id
+            }
+            self._devices[device] = self.run_id
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the ledger back to disk if it changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = self._file.dumps(self._data)
+            self._dirty = False
+        self._file.write(payload)
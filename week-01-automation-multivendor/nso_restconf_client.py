@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+NSO RESTCONF Client
+===================
+Shared HTTP layer for the NSO RESTCONF tools in this folder.
+
+A single pooled keep-alive session per NSO server, with transport-level
+retries, an optional global request rate limit, conditional GETs
+(ETag / Last-Modified) and per-request timing statistics, plus the JSON
+file persistence shared by the on-disk caches under ~/.cache/nso-restconf.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_HEADERS = {
+    'Accept': 'application/yang-data+json'
+}
+
+RETRY_STATUS_CODES = [500, 502, 503, 504]
+
+CACHE_DIR = Path.home() / '.cache' / 'nso-restconf'
+
+
+class JsonCacheFile:
+    """Versioned JSON document on disk, read once and replaced atomically on save"""
+
+    def __init__(self, path: Path, version: int, label: str, indent: Optional[int] = None):
+        """
+        Args:
+            path: File location
+            version: Format version; a file with another version is ignored
+            label: What the file holds, used in warnings (e.g. 'platform cache')
+            indent: JSON indentation of the written file (None: compact)
+        """
+        self.path = Path(path)
+        self.version = version
+        self.label = label
+        self.indent = indent
+
+    def load(self, empty: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the stored document, or `empty` when the file is missing,
+        unreadable, corrupt or of another version (always with a 'version' key)
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if isinstance(data, dict) and data.get('version') == self.version:
+                return data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable {self.label} {self.path}: {e}")
+        return dict(empty, version=self.version)
+
+    def dumps(self, data: Dict[str, Any]) -> str:
+        """Serialise a document (call under the owner's lock, then write() outside it)"""
+        return json.dumps(dict(data, version=self.version), indent=self.indent)
+
+    def write(self, payload: str) -> bool:
+        """
+        Write a serialised document (atomic replace through a uniquely named
+        temporary file, so concurrent runs never interleave their writes)
+
+        Returns:
+            True if the file was written
+        """
+        tmp_name = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.path.parent,
+                                             prefix=f".{self.path.name}.", suffix='.tmp', delete=False) as f:
+                tmp_name = f.name
+                f.write(payload)
+            os.replace(tmp_name, self.path)
+            return True
+        except OSError as e:
+            print(f"⚠️  Unable to write {self.label} {self.path}: {e}")
+            if tmp_name:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+            return False
+
+    def save(self, data: Dict[str, Any]) -> bool:
+        """Serialise and write a document"""
+        return self.write(self.dumps(data))
+
+
+class RequestStats:
+    """Thread-safe latency counters for RESTCONF requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.total_time = 0.0
+        self.min_time = None
+        self.max_time = 0.0
+        self.by_method = {}
+
+    def record(self, method: str, elapsed: float, failed: bool = False) -> None:
+        """Record the duration (in seconds) of one request"""
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+            self.min_time = elapsed if self.min_time is None else min(self.min_time, elapsed)
+            self.by_method[method] = self.by_method.get(method, 0) + 1
+            if failed:
+                self.errors += 1
+
+    def record_not_modified(self) -> None:
+        """Count a conditional request answered with 304 Not Modified"""
+        with self._lock:
+            self.not_modified += 1
+
+    def summary(self) -> Dict[str, float]:
+        """Return a snapshot of the collected statistics"""
+        with self._lock:
+            return {
+                'requests': self.count,
+                'errors': self.errors,
+                'not_modified': self.not_modified,
+                'total_time': self.total_time,
+                'avg_time': self.total_time / self.count if self.count else 0.0,
+                'min_time': self.min_time or 0.0,
+                'max_time': self.max_time,
+                'by_method': dict(self.by_method)
+            }
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing request starts to at most `rate` per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Block until the next request slot is due"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ValidatorCache:
+    """Thread-safe store of (ETag, Last-Modified, content digest) per URL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Optional[str], Optional[str], str]] = {}
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+        with self._lock:
+            return self._entries.get(url)
+
+    def set(self, url: str, etag: Optional[str], last_modified: Optional[str], digest: str) -> None:
+        with self._lock:
+            self._entries[url] = (etag, last_modified, digest)
+
+    def discard(self, url: str) -> None:
+        with self._lock:
+            self._entries.pop(url, None)
+
+
+class RestconfClient:
+    """Pooled keep-alive RESTCONF session towards one NSO server"""
+
+    def __init__(self, base_url: str, username: str, password: str,
+                 pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                 timeout: float = 10, verify: bool = True, rate_limit: Optional[float] = None):
+        """
+        Args:
+            base_url: NSO base URL, e.g. http://localhost:8080
+            username: NSO username
+            password: NSO password
+            pool_size: Maximum number of keep-alive connections kept to NSO
+                       (match it to the number of concurrent workers)
+            retries: Transport retries on connection errors and 5xx responses
+            backoff_factor: Exponential backoff factor between retries
+            timeout: Default request timeout in seconds
+            verify: Verify the TLS certificate of NSO
+            rate_limit: Maximum requests per second sent to NSO across all
+                        threads (None or 0: unlimited)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.stats = RequestStats()
+        self.validators = ValidatorCache()
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+
+        # Idempotent methods only are retried on read errors and 5xx responses;
+        # connection errors are retried for every method since nothing was sent.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.verify = verify
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path: str) -> str:
+        """Build an absolute URL from a RESTCONF path"""
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}{path}"
+
+    def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """Send a request through the pooled session and record its duration"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(
+                method,
+                self.url(path),
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+            failed = response.status_code >= 400
+            return response
+        finally:
+            self.stats.record(method, time.perf_counter() - start, failed)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def get_conditional(self, path: str, **kwargs) -> Tuple[requests.Response, Optional[str]]:
+        """
+        Conditional GET driven by the validators remembered for the URL.
+
+        Sends If-None-Match / If-Modified-Since when an ETag / Last-Modified
+        was remembered for the URL, a plain GET otherwise. No response body is
+        ever cached: on 304 Not Modified the digest remembered together with
+        the validators is returned to identify the unchanged content, and the
+        response is closed. For any other status the digest is None and the
+        caller reads the body, then calls remember() once it parsed it.
+
+        Returns:
+            Tuple of (response, digest of the unchanged content or None)
+        """
+        url = self.url(path)
+        cached = self.validators.get(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = self.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and cached:
+            self.stats.record_not_modified()
+            response.close()
+            return response, cached[2]
+        return response, None
+
+    def remember(self, path: str, response: requests.Response, digest: str) -> None:
+        """
+        Remember the validators of a 200 response whose body was parsed
+        successfully, with a small digest of the parsed content. A response
+        without validators forgets the URL.
+        """
+        url = self.url(path)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.validators.set(url, etag, last_modified, digest)
+        else:
+            self.validators.discard(url)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def print_stats(self) -> None:
+        """Print a one-block summary of the request statistics"""
+        stats = self.stats.summary()
+        print(f"""    🌐 RESTCONF Requests:
+       • Requests Sent: {stats['requests']} ({stats['errors']} failed, {stats['not_modified']} not modified)
+       • Average Latency: {stats['avg_time'] * 1000:.1f} ms
+       • Min / Max Latency: {stats['min_time'] * 1000:.1f} ms / {stats['max_time'] * 1000:.1f} ms
+       • Total Request Time: {stats['total_time']:.2f}s""")
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
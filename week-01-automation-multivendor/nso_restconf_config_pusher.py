@@ -5,29 +5,73 @@ Applies XML configuration files to NSO devices via RESTCONF API
 """
 
 import argparse
+import json
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import quote
+from xml.sax.saxutils import escape
 import requests
-from typing import Optional
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from nso_push_ledger import DEFAULT_LEDGER_FILE, PushLedger
+from nso_restconf_client import RestconfClient
+from nso_xml_payloads import XmlPayload, check_payload, iter_body, iter_payloads
+
+
+YANG_PATCH_NS = 'urn:ietf:params:xml:ns:yang:ietf-yang-patch'
+COMMIT_QUEUE_PATH = '/restconf/data/tailf-ncs:devices/commit-queue'
+DEVICE_NAMES_PATH = '/restconf/data/tailf-ncs:devices/device?fields=name'
+PREFLIGHT_MODES = ['off', 'local', 'dry-run']
 
 
 class ConfigPusher:
     """Handles NSO RESTCONF configuration operations"""
     
-    def __init__(self, nso_url: str, username: str, password: str):
+    def __init__(self, nso_url: str, username: str, password: str,
+                 pool_size: int = 10, retries: int = 3, rate_limit: Optional[float] = None,
+                 commit_queue: Optional[str] = None, ledger: Optional[PushLedger] = None):
+        """
+        Args:
+            commit_queue: NSO commit-queue mode of every push ('async', 'sync'
+                          or 'bypass'); None uses the NSO default. With 'async'
+                          the queue item ids are collected in queue_items.
+            ledger: Ledger recording every successful push of an XmlPayload,
+                    with the NSO rollback id (or queue item) of the transaction
+        """
         self.nso_url = nso_url
         self.username = username
         self.password = password
-        self.session = requests.Session()
-        self.session.auth = (username, password)
+        self.client = RestconfClient(
+            nso_url,
+            username,
+            password,
+            pool_size=pool_size,
+            retries=retries,
+            timeout=30,
+            rate_limit=rate_limit
+        )
+        self.session = self.client.session
+        self.commit_queue = commit_queue
+        self.queue_items: Dict[str, Tuple[str, int]] = {}
+        self.ledger = ledger
+        self._queued_pushes: Dict[str, List[Tuple[str, XmlPayload]]] = {}
+        self._queue_lock = threading.Lock()
     
-    def push_config(self, device_name: str, xml_payload: str) -> bool:
+    def push_config(self, device_name: str, xml_payload: Union[str, XmlPayload],
+                    log: Callable[[str], None] = print) -> bool:
         """
         Push XML configuration to NSO device
         
         Args:
             device_name: Target device name in NSO
-            xml_payload: XML configuration payload
+            xml_payload: XML configuration payload, as text or as an XmlPayload
+                         whose body is streamed from disk
+            log: Output function for progress messages (default: print)
             
         Returns:
             True if successful, False otherwise
@@ -38,67 +82,563 @@ class ConfigPusher:
             "Accept": "application/yang-data+json"
         }
         
-        print(f"🚀 Pushing configuration to device: {device_name}")
-        print(f"🔗 URL: {url}")
-        print("📡 Sending PATCH request...\n")
+        log(f"🚀 Pushing configuration to device: {device_name}")
+        log(f"🔗 URL: {url}")
+        log("📡 Sending PATCH request...\n")
         
+        body = None
         try:
-            response = self.session.patch(
+            # Opened here: a payload file gone or unreadable since discovery fails this push only
+            body = xml_payload.open() if isinstance(xml_payload, XmlPayload) else xml_payload
+            response = self.client.patch(
                 url,
                 headers=headers,
-                data=xml_payload,
-                timeout=30
+                params=self._params(),
+                data=body
             )
             
-            return self._handle_response(response, device_name)
+            if not self._handle_response(response, device_name, log):
+                return False
+            self._record_push([(device_name, xml_payload)], response)
+            return True
             
         except requests.exceptions.Timeout:
-            print("⏱️  Request timeout - NSO took too long to respond")
+            log("⏱️  Request timeout - NSO took too long to respond")
             return False
         except requests.exceptions.ConnectionError:
-            print(f"🔌 Connection error - Cannot reach NSO at {self.nso_url}")
+            log(f"🔌 Connection error - Cannot reach NSO at {self.nso_url}")
             return False
         except Exception as e:
-            print(f"💥 Unexpected error: {str(e)}")
+            log(f"💥 Unexpected error: {str(e)}")
             return False
+        finally:
+            if isinstance(xml_payload, XmlPayload) and body is not None:
+                body.close()
+    
+    def _params(self) -> Optional[Dict[str, str]]:
+        params = {}
+        if self.commit_queue:
+            params['commit-queue'] = self.commit_queue
+        if self.ledger is not None:
+            params['rollback-id'] = 'true'
+        return params or None
     
-    def _handle_response(self, response: requests.Response, device_name: str) -> bool:
+    def _record_push(self, pushes: List[Tuple[str, Union[str, XmlPayload]]],
+                     response: requests.Response) -> None:
+        """Record successful pushes in the ledger (after queue completion with async)"""
+        pushes = [(device_name, payload) for device_name, payload in pushes if isinstance(payload, XmlPayload)]
+        if self.ledger is None or not pushes:
+            return
+        if self.commit_queue == 'async':
+            queue_id = extract_queue_id(response)
+            if queue_id is not None:
+                with self._queue_lock:
+                    self._queued_pushes[queue_id] = pushes
+            return
+        transaction = extract_transaction_id(response)
+        for device_name, payload in pushes:
+            self.ledger.record(device_name, payload.sha256(), payload.source, transaction)
+    
+    def _handle_response(self, response: requests.Response, device_name: str,
+                         log: Callable[[str], None] = print, files: int = 1) -> bool:
         """Handle and display API response"""
         
+        if response.status_code in [200, 201, 204] and self.commit_queue == 'async':
+            queue_id = extract_queue_id(response)
+            log("=" * 60)
+            log("📬 QUEUED! Configuration accepted by the NSO commit queue")
+            log("=" * 60)
+            log(f"📱 Device: {device_name}")
+            log(f"📊 Status Code: {response.status_code}")
+            log(f"⏰ Response Time: {response.elapsed.total_seconds():.2f}s")
+            if queue_id is None:
+                log("\n⚠️  No commit-queue item id returned, completion cannot be tracked")
+                return True
+            with self._queue_lock:
+                self.queue_items[queue_id] = (device_name, files)
+            log(f"🆔 Queue Item: {queue_id}")
+            log("\n⏳ NSO is applying the configuration to the device in the background")
+            return True
+        
         if response.status_code in [200, 201, 204]:
-            print("=" * 60)
-            print("✅ SUCCESS! Configuration applied successfully")
-            print("=" * 60)
-            print(f"📱 Device: {device_name}")
-            print(f"📊 Status Code: {response.status_code}")
-            print(f"⏰ Response Time: {response.elapsed.total_seconds():.2f}s")
+            log("=" * 60)
+            log("✅ SUCCESS! Configuration applied successfully")
+            log("=" * 60)
+            log(f"📱 Device: {device_name}")
+            log(f"📊 Status Code: {response.status_code}")
+            log(f"⏰ Response Time: {response.elapsed.total_seconds():.2f}s")
             
             if response.text:
-                print(f"\n📄 Response Body:\n{response.text}")
+                log(f"\n📄 Response Body:\n{response.text}")
             
-            print("\n🎉 Configuration is now active on the device!")
+            log("\n🎉 Configuration is now active on the device!")
             return True
         else:
-            print("=" * 60)
-            print("❌ FAILED! Configuration could not be applied")
-            print("=" * 60)
-            print(f"📱 Device: {device_name}")
-            print(f"📊 Status Code: {response.status_code}")
-            print(f"⏰ Response Time: {response.elapsed.total_seconds():.2f}s")
-            print(f"\n❗ Error Details:\n{response.text}")
-            print("\n💡 Tip: Check device connectivity and XML syntax")
+            log("=" * 60)
+            log("❌ FAILED! Configuration could not be applied")
+            log("=" * 60)
+            log(f"📱 Device: {device_name}")
+            log(f"📊 Status Code: {response.status_code}")
+            log(f"⏰ Response Time: {response.elapsed.total_seconds():.2f}s")
+            log(f"\n❗ Error Details:\n{response.text}")
+            log("\n💡 Tip: Check device connectivity and XML syntax")
             return False
+    
+    def push_batch(self, jobs: List[Tuple[str, str, Union[str, XmlPayload]]]) -> bool:
+        """
+        Push many configuration files, across devices, as one NSO transaction
+        
+        All payloads are merged into a single YANG-Patch (RFC 8072) sent to the
+        tailf-ncs:devices root, one ordered edit per file. NSO applies the edits
+        in one transaction and one commit: either every file is applied or none.
+        The document is streamed (chunked), payload bodies are read from disk
+        while sending.
+        
+        Args:
+            jobs: List of (file name, device name, XML payload) in push order
+            
+        Returns:
+            True if the whole batch was applied, False otherwise
+        """
+        url = f"{self.nso_url}/restconf/data/tailf-ncs:devices"
+        headers = {
+            "Content-Type": "application/yang-patch+xml",
+            "Accept": "application/yang-data+json"
+        }
+        devices = list(OrderedDict.fromkeys(device for _, device, _ in jobs))
+        target = f"{len(devices)} device(s): {', '.join(devices)}"
+        
+        print(f"🚀 Pushing {len(jobs)} configuration(s) to {len(devices)} device(s) in one transaction")
+        print(f"🔗 URL: {url}")
+        print("📡 Sending YANG-Patch request...\n")
+        
+        try:
+            response = self.client.patch(
+                url,
+                headers=headers,
+                params=self._params(),
+                data=build_yang_patch(jobs)
+            )
+            
+            if not self._handle_response(response, target, files=len(jobs)):
+                return False
+            self._record_push([(device_name, payload) for _, device_name, payload in jobs], response)
+            return True
+            
+        except requests.exceptions.Timeout:
+            print("⏱️  Request timeout - NSO took too long to respond")
+            return False
+        except requests.exceptions.ConnectionError:
+            print(f"🔌 Connection error - Cannot reach NSO at {self.nso_url}")
+            return False
+        except Exception as e:
+            print(f"💥 Unexpected error: {str(e)}")
+            return False
+    
+    def dry_run(self, jobs: List[Tuple[str, str, Union[str, XmlPayload]]]) -> Tuple[bool, str]:
+        """
+        Ask NSO to validate payloads without committing them (dry-run)
+        
+        The payloads are sent as one YANG-Patch with dry-run=native, so NSO
+        checks the whole set against the device models in a single call.
+        Nothing is printed, the caller reports the outcome.
+        
+        Args:
+            jobs: List of (file name, device name, XML payload) in push order
+            
+        Returns:
+            Tuple of (accepted, dry-run result or error details)
+        """
+        try:
+            response = self.client.patch(
+                f"{self.nso_url}/restconf/data/tailf-ncs:devices",
+                headers={
+                    "Content-Type": "application/yang-patch+xml",
+                    "Accept": "application/yang-data+json"
+                },
+                params={'dry-run': 'native'},
+                data=build_yang_patch(jobs)
+            )
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+        
+        if response.status_code in [200, 201, 204]:
+            return True, response.text
+        return False, response.text.strip() or f"HTTP {response.status_code}"
+    
+    def get_device_names(self) -> Optional[set]:
+        """Return the names of the devices known to NSO, or None if unavailable"""
+        try:
+            response = self.client.get(DEVICE_NAMES_PATH)
+            response.raise_for_status()
+            devices = response.json().get('tailf-ncs:device', [])
+            return {device['name'] for device in devices if 'name' in device}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"⚠️  Unable to read the NSO device list: {e}")
+            return None
+    
+    def wait_for_queue(self, poll_interval: float = 2.0, timeout: float = 600.0) -> Dict[str, str]:
+        """
+        Poll the NSO commit queue until every collected queue item is done
+        
+        Each round costs one GET for the whole queue, whatever the number of
+        items in flight. An item that left the queue is looked up once in the
+        completed-items history to tell success from failure; when that
+        lookup fails or finds nothing, the item is 'unknown' (not confirmed).
+        
+        Args:
+            poll_interval: Seconds between two polls
+            timeout: Seconds to wait before giving up on the pending items
+            
+        Returns:
+            Dictionary of queue item id -> 'completed', 'failed', 'unknown' or 'timeout'
+        """
+        with self._queue_lock:
+            pending = dict(self.queue_items)
+        results = {}
+        deadline = time.monotonic() + timeout
+        
+        print(f"\n⏳ Waiting for {len(pending)} commit-queue item(s)...")
+        while pending:
+            active = self._get_queue_status()
+            if active is not None:
+                for queue_id in list(pending):
+                    status = active.get(queue_id)
+                    if status is None:
+                        status = self._get_completed_status(queue_id)
+                    elif status not in ('completed', 'failed'):
+                        continue
+                    results[queue_id] = status
+                    device_name, _ = pending.pop(queue_id)
+                    with self._queue_lock:
+                        pushes = self._queued_pushes.pop(queue_id, [])
+                    if status == 'completed' and self.ledger is not None:
+                        for pushed_device, payload in pushes:
+                            self.ledger.record(pushed_device, payload.sha256(), payload.source, f"commit-queue {queue_id}")
+                    if status == 'unknown':
+                        print(f"   ❓ Queue item {queue_id} ({device_name}): left the queue, outcome not confirmed")
+                    else:
+                        icon = '✅' if status == 'completed' else '❌'
+                        print(f"   {icon} Queue item {queue_id} ({device_name}): {status}")
+            
+            if pending and time.monotonic() + poll_interval > deadline:
+                for queue_id, (device_name, _) in pending.items():
+                    results[queue_id] = 'timeout'
+                    print(f"   ⏱️  Queue item {queue_id} ({device_name}): still queued after {timeout:.0f}s")
+                break
+            if pending:
+                time.sleep(poll_interval)
+        
+        return results
+    
+    def _get_queue_status(self) -> Optional[Dict[str, str]]:
+        """Return queue item id -> status of the items still in the NSO commit queue"""
+        try:
+            response = self.client.get(f"{COMMIT_QUEUE_PATH}?fields=queue-item(id;status)")
+            if response.status_code == 204:
+                return {}
+            response.raise_for_status()
+            queue = response.json().get('tailf-ncs:commit-queue', {})
+            return {
+                str(item.get('id')): str(item.get('status', ''))
+                for item in queue.get('queue-item', [])
+            }
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"   ⚠️  Unable to read the commit queue: {e}")
+            return None
+    
+    def _get_completed_status(self, queue_id: str) -> str:
+        """
+        Return 'completed' or 'failed' for an item that left the commit queue,
+        or 'unknown' when NSO cannot confirm its outcome (no completed-items
+        history, item not found, request or parse error)
+        """
+        try:
+            response = self.client.get(f"{COMMIT_QUEUE_PATH}/completed/queue-item={queue_id}")
+            if response.status_code != 200:
+                return 'unknown'
+            items = response.json().get('tailf-ncs:queue-item', [])
+            if not items or 'succeeded' not in items[0]:
+                return 'unknown'
+            return 'completed' if items[0]['succeeded'] else 'failed'
+        except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+            print(f"   ⚠️  Unable to read the outcome of queue item {queue_id}: {e}")
+            return 'unknown'
+    
+    def push_device_queue(self, device_name: str,
+                          jobs: List[Tuple[str, Union[str, XmlPayload]]]) -> Tuple[int, int, List[str]]:
+        """
+        Push the configuration files of one device, one after another
+        
+        Files for the same device are never sent concurrently, so patches to a
+        device are applied in the order they were given. Safe to run from
+        worker threads: progress messages are collected and returned instead
+        of printed.
+        
+        Args:
+            device_name: Target device name in NSO
+            jobs: List of (file name, XML payload) in push order
+            
+        Returns:
+            Tuple of (successful, failed, progress log lines)
+        """
+        log_lines = []
+        successful = 0
+        failed = 0
+        
+        for xml_file, xml_payload in jobs:
+            log_lines.append(f"\n📦 {xml_file} → {device_name}")
+            if self.push_config(device_name, xml_payload, log=log_lines.append):
+                successful += 1
+            else:
+                failed += 1
+        
+        return successful, failed, log_lines
+
+
+def build_yang_patch(jobs: List[Tuple[str, str, Union[str, XmlPayload]]]) -> Iterator[bytes]:
+    """
+    Build a YANG-Patch document merging device configurations
+    
+    Each payload is a <config xmlns="http://tail-f.com/ns/ncs"> element, as
+    accepted by PATCH .../device={name}/config; it becomes the value of one
+    merge edit targeting that device's config, relative to tailf-ncs:devices.
+    The device name is percent-encoded as a RESTCONF list key in the target
+    path, which is then XML-escaped.
+    
+    Args:
+        jobs: List of (file name, device name, XML payload) in edit order
+        
+    Returns:
+        Generator of the YANG-Patch XML document, in chunks
+    """
+    parts = [
+        f'<yang-patch xmlns="{YANG_PATCH_NS}">\n',
+        f"  <patch-id>config-pusher-{int(time.time())}</patch-id>\n"
+    ]
+    for edit_id, (xml_file, device_name, xml_payload) in enumerate(jobs, 1):
+        if not isinstance(xml_payload, XmlPayload):
+            xml_payload = XmlPayload(xml_file, device_name, data=xml_payload.encode('utf-8'))
+        target = escape(f"/device={quote(device_name, safe='')}/config")
+        parts += [
+            f"""  <edit>
+    <edit-id>{edit_id}</edit-id>
+    <operation>merge</operation>
+    <target>{target}</target>
+    <value>
+""",
+            xml_payload,
+            """
+    </value>
+  </edit>
+"""
+        ]
+    parts.append("</yang-patch>\n")
+    
+    return iter_body(parts)
+
+
+def skip_unchanged(pusher: ConfigPusher,
+                   device_jobs: Dict[str, List[Tuple[str, Union[str, XmlPayload]]]],
+                   ledger: PushLedger, verify: bool = False) -> List[Tuple[str, str]]:
+    """
+    Drop the payloads the ledger shows as already applied to their device
+    
+    With verify, the payloads about to be skipped are first dry-run against
+    NSO in one call; those whose device would still change are kept.
+    Devices left without payloads are dropped from device_jobs.
+    
+    Args:
+        pusher: ConfigPusher connected to NSO
+        device_jobs: Device name -> list of (file name, payload), updated in place
+        ledger: Ledger of the previous successful pushes
+        verify: Confirm with an NSO dry-run that skipped payloads are no-ops
+        
+    Returns:
+        List of skipped (file name, device name)
+    """
+    candidates = [
+        (xml_file, device_name, payload)
+        for device_name, jobs in device_jobs.items()
+        for xml_file, payload in jobs
+        if isinstance(payload, XmlPayload) and ledger.is_current(device_name, payload.sha256())
+    ]
+    if not candidates:
+        return []
+    
+    if verify:
+        accepted, result = pusher.dry_run(candidates)
+        changed = extract_dry_run_devices(result) if accepted else None
+        if changed is None:
+            print("⚠️  Unable to verify unchanged payloads with a dry-run, pushing them again")
+            return []
+        candidates = [job for job in candidates if job[1] not in changed]
+    
+    for xml_file, device_name, payload in candidates:
+        device_jobs[device_name].remove((xml_file, payload))
+        pushed = ledger.get(device_name, payload.sha256())
+        pushed_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(pushed['pushed_at']))
+        transaction = f", transaction {pushed['transaction']}" if pushed.get('transaction') else ""
+        print(f"⏭️  {xml_file} → {device_name}: unchanged since {pushed_at}{transaction}")
+    
+    for device_name in [name for name, jobs in device_jobs.items() if not jobs]:
+        del device_jobs[device_name]
+    
+    return [(xml_file, device_name) for xml_file, device_name, _ in candidates]
+
+
+def extract_dry_run_devices(result: str) -> Optional[set]:
+    """
+    Return the devices an NSO dry-run result would change
+    
+    Args:
+        result: Body of a dry-run response (empty when nothing would change)
+        
+    Returns:
+        Set of device names, or None if the result cannot be read
+    """
+    if not result.strip():
+        return set()
+    try:
+        data = json.loads(result)
+        dry_run = next((value for key, value in data.items() if key.endswith('dry-run-result')), {})
+        return {
+            device.get('name')
+            for output in dry_run.values() if isinstance(output, dict)
+            for device in output.get('device', [])
+            if device.get('data')
+        }
+    except (ValueError, AttributeError):
+        return None
+
+
+def run_preflight(pusher: ConfigPusher,
+                  device_jobs: Dict[str, List[Tuple[str, Union[str, XmlPayload]]]],
+                  mode: str, workers: int = 8) -> List[Tuple[str, str, str]]:
+    """
+    Reject invalid payloads before any configuration is pushed
+    
+    'local' only checks the structure of every payload, without touching the
+    device configs: the target device must exist in NSO and the payload must
+    be well-formed XML with a RESTCONF <config> root. The content is not
+    validated against the NED models; 'dry-run' does that by asking NSO
+    to validate all remaining payloads in one dry-run call; only when that
+    call fails are the payloads dry-run one by one to find the culprits.
+    
+    Rejected payloads are removed from device_jobs (devices left without
+    payloads are dropped).
+    
+    Args:
+        pusher: ConfigPusher connected to NSO
+        device_jobs: Device name -> list of (file name, payload), updated in place
+        mode: One of PREFLIGHT_MODES
+        workers: Parallel dry-runs when isolating failures
+        
+    Returns:
+        List of rejected (file name, device name, reason)
+    """
+    rejected = []
+    if mode == 'off' or not device_jobs:
+        return rejected
+    
+    print("\n" + "=" * 60)
+    print("🛫 PRE-FLIGHT CHECKS")
+    print("=" * 60)
+    
+    known_devices = pusher.get_device_names()
+    
+    def reject(device_name: str, xml_file: str, payload, reason: str) -> None:
+        rejected.append((xml_file, device_name, reason))
+        device_jobs[device_name].remove((xml_file, payload))
+        print(f"   ❌ {xml_file} → {device_name}: {reason}")
+    
+    for device_name, jobs in list(device_jobs.items()):
+        for xml_file, payload in list(jobs):
+            if known_devices is not None and device_name not in known_devices:
+                reject(device_name, xml_file, payload, "device not found in NSO")
+                continue
+            if isinstance(payload, XmlPayload):
+                body = payload
+            else:
+                body = XmlPayload(xml_file, device_name, data=payload.encode('utf-8'))
+            problems = check_payload(body)
+            if problems:
+                reject(device_name, xml_file, payload, "; ".join(problems))
+    
+    if mode == 'dry-run':
+        batch = [
+            (xml_file, device_name, payload)
+            for device_name, jobs in device_jobs.items()
+            for xml_file, payload in jobs
+        ]
+        if batch:
+            accepted, details = pusher.dry_run(batch)
+            if accepted:
+                print(f"🧪 NSO dry-run accepted all {len(batch)} payload(s)")
+            else:
+                print("🧪 NSO dry-run rejected the batch, checking payloads one by one...")
+                with ThreadPoolExecutor(max_workers=min(workers, len(batch))) as executor:
+                    results = executor.map(lambda job: pusher.dry_run([job]), batch)
+                    for (xml_file, device_name, payload), (ok, details) in zip(batch, results):
+                        if not ok:
+                            reject(device_name, xml_file, payload, f"dry-run failed: {details}")
+    
+    for device_name in [name for name, jobs in device_jobs.items() if not jobs]:
+        del device_jobs[device_name]
+    
+    passed = sum(len(jobs) for jobs in device_jobs.values())
+    print(f"✅ {passed} payload(s) passed, ❌ {len(rejected)} rejected")
+    return rejected
 
 
-def load_xml_file(file_path: str) -> Optional[str]:
+def extract_queue_id(response: requests.Response) -> Optional[str]:
     """
-    Load XML content from file
+    Extract the commit-queue item id from an NSO RESTCONF response
+    
+    Args:
+        response: Response of a write sent with commit-queue=async
+        
+    Returns:
+        Queue item id, or None if the response does not carry one
+    """
+    try:
+        result = response.json().get('tailf-restconf:result', {})
+        queue_id = result.get('commit-queue', {}).get('id')
+    except (ValueError, AttributeError):
+        return None
+    return None if queue_id is None else str(queue_id)
+
+
+def extract_transaction_id(response: requests.Response) -> Optional[str]:
+    """
+    Extract the NSO transaction reference of a successful write
+    
+    Returns:
+        Rollback id requested with rollback-id=true, else the ETag NSO sets
+        on writes, or None
+    """
+    try:
+        rollback_id = response.json().get('tailf-restconf:result', {}).get('rollback', {}).get('id')
+    except (ValueError, AttributeError):
+        rollback_id = None
+    if rollback_id is not None:
+        return f"rollback {rollback_id}"
+    return response.headers.get('ETag')
+
+
+def load_xml_file(file_path: str) -> Optional[List[XmlPayload]]:
+    """
+    Load the device payloads of an XML file
+    
+    The file is scanned with iterparse, never loaded as a whole: a RESTCONF
+    format file gives one payload streamed from disk at push time, a CLI
+    format file (devices/device wrapper) is split into one payload per device.
     
     Args:
         file_path: Path to XML file
         
     Returns:
-        XML content as string, or None if failed
+        List of XmlPayload, or None if failed
     """
     try:
         path = Path(file_path)
@@ -115,14 +655,16 @@ def load_xml_file(file_path: str) -> Optional[str]:
             print(f"⚠️  Warning: File doesn't have .xml extension: {file_path}")
         
         print(f"📂 Loading XML file: {file_path}")
-        content = path.read_text(encoding='utf-8')
-        print(f"📏 File size: {len(content)} characters")
+        print(f"📏 File size: {path.stat().st_size} bytes")
+        payloads = list(iter_payloads(path))
+        if len(payloads) > 1:
+            print(f"✂️  Split into {len(payloads)} per-device payloads")
         print("✅ File loaded successfully\n")
         
-        return content
+        return payloads
         
-    except UnicodeDecodeError:
-        print(f"❌ Cannot decode file - not valid UTF-8: {file_path}")
+    except ET.ParseError as e:
+        print(f"❌ Invalid XML in {file_path}: {e}")
         return None
     except PermissionError:
         print(f"❌ Permission denied reading file: {file_path}")
@@ -132,25 +674,6 @@ def load_xml_file(file_path: str) -> Optional[str]:
         return None
 
 
-def extract_device_name(xml_content: str) -> Optional[str]:
-    """
-    Extract device name from XML payload
-    
-    Args:
-        xml_content: XML configuration content
-        
-    Returns:
-        Device name if found, None otherwise
-    """
-    import re
-    
-    # Try to find device name in XML
-    match = re.search(r'<name>([^<]+)</name>', xml_content)
-    if match:
-        return match.group(1)
-    return None
-
-
 def main():
     """Main entry point"""
     
@@ -163,6 +686,11 @@ Examples:
   %(prog)s config.xml -d dc1-fgt-fw01
   %(prog)s config.xml -u admin -p admin123 -n http://nso.example.com:8080
   %(prog)s config1.xml config2.xml config3.xml
+  %(prog)s configs/*.xml --workers 16 --rate 20
+  %(prog)s configs/*.xml --batch
+  %(prog)s configs/*.xml --async --workers 32
+  %(prog)s configs/*.xml --preflight dry-run --check-only
+  %(prog)s configs/*.xml --force
         """
     )
     
@@ -195,6 +723,93 @@ Examples:
         help='NSO password (default: admin)'
     )
     
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Retries with backoff on connection errors (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of devices configured in parallel; files for one device are always pushed in order (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Push all files, across devices, as a single YANG-Patch in one NSO transaction (all or nothing)'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='async_push',
+        action='store_true',
+        help='Push through the NSO commit queue (commit-queue=async) and poll the queue items until they complete'
+    )
+    
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=2.0,
+        help='Seconds between commit-queue polls with --async (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--queue-timeout',
+        type=float,
+        default=600.0,
+        help='Seconds to wait for commit-queue items with --async (default: 600)'
+    )
+    
+    parser.add_argument(
+        '--preflight',
+        choices=PREFLIGHT_MODES,
+        default='off',
+        help='Checks before pushing: off, local (device exists in NSO, XML well-formed with a <config> root; '
+             'the content is not validated) or dry-run (local checks plus one NSO dry-run of all payloads, '
+             'which validates them against the NED models) (default: off)'
+    )
+    
+    parser.add_argument(
+        '--check-only',
+        action='store_true',
+        help='Run the pre-flight checks and exit without pushing'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Push every payload, even those the ledger shows as already applied'
+    )
+    
+    parser.add_argument(
+        '--verify-unchanged',
+        action='store_true',
+        help='Dry-run the payloads the ledger would skip and push those that would still change a device'
+    )
+    
+    parser.add_argument(
+        '--ledger',
+        default=str(DEFAULT_LEDGER_FILE),
+        help=f'Ledger of successful pushes (default: {DEFAULT_LEDGER_FILE})'
+    )
+    
+    parser.add_argument(
+        '--no-ledger',
+        action='store_true',
+        help='Neither read nor write the push ledger (push everything, record nothing)'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=0,
+        help='Maximum RESTCONF requests per second sent to NSO, 0 for no limit (default: 0)'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -202,67 +817,164 @@ Examples:
     )
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.rate < 0:
+        parser.error('--rate cannot be negative')
+    if args.check_only and args.preflight == 'off':
+        parser.error('--check-only needs --preflight local or dry-run')
     
     print("\n" + "=" * 60)
     print("🔧 NSO RESTCONF Configuration Pusher")
     print("=" * 60 + "\n")
     
     # Initialize pusher
-    pusher = ConfigPusher(args.nso_url, args.username, args.password)
+    ledger = None if args.no_ledger else PushLedger(args.ledger, args.nso_url)
+    pusher = ConfigPusher(
+        args.nso_url,
+        args.username,
+        args.password,
+        pool_size=args.workers,
+        retries=args.retries,
+        rate_limit=args.rate or None,
+        commit_queue='async' if args.async_push else None,
+        ledger=ledger
+    )
     
     # Track results
     total_files = len(args.xml_files)
     successful = 0
     failed = 0
+    skipped = 0
+    device_jobs: Dict[str, List[Tuple[str, Union[str, XmlPayload]]]] = OrderedDict()
     
-    # Process each file
+    # Load each file and queue it behind the earlier files of the same device
     for i, xml_file in enumerate(args.xml_files, 1):
         print(f"\n{'🔷' * 30}")
         print(f"📦 Processing file {i}/{total_files}: {xml_file}")
         print(f"{'🔷' * 30}\n")
         
-        # Load XML content
-        xml_content = load_xml_file(xml_file)
-        if not xml_content:
+        # Load XML payloads (one per device)
+        payloads = load_xml_file(xml_file)
+        if not payloads:
             print(f"⏭️  Skipping file: {xml_file}\n")
             failed += 1
             continue
         
-        # Determine device name
-        device_name = args.device
-        if not device_name:
-            device_name = extract_device_name(xml_content)
-            if not device_name:
-                print("❌ No device name specified and couldn't extract from XML")
-                print("💡 Use -d/--device option to specify device name\n")
+        if args.device and len(payloads) > 1:
+            # Multi-device file: -d selects the device to push
+            payloads = [payload for payload in payloads if payload.device == args.device]
+            if not payloads:
+                print(f"❌ Device {args.device} not found in {xml_file}\n")
                 failed += 1
                 continue
-            print(f"🔍 Auto-detected device name: {device_name}\n")
-        
-        # Show XML preview if verbose
-        if args.verbose:
-            print("📝 XML Preview (first 500 chars):")
-            print("-" * 60)
-            print(xml_content[:500])
-            if len(xml_content) > 500:
-                print("...")
-            print("-" * 60 + "\n")
-        
-        # Push configuration
-        if pusher.push_config(device_name, xml_content):
-            successful += 1
+        
+        for payload in payloads:
+            # Determine device name
+            device_name = args.device
+            if not device_name:
+                device_name = payload.device
+                if not device_name:
+                    print("❌ No device name specified and couldn't extract from XML")
+                    print("💡 Use -d/--device option to specify device name\n")
+                    failed += 1
+                    continue
+                print(f"🔍 Auto-detected device name: {device_name}\n")
+            
+            # Show XML preview if verbose
+            if args.verbose:
+                print("📝 XML Preview (first 500 chars):")
+                print("-" * 60)
+                print(payload.preview(500))
+                if payload.size > 500:
+                    print("...")
+                print("-" * 60 + "\n")
+            
+            device_jobs.setdefault(device_name, []).append((xml_file, payload))
+    
+    # Skip the payloads already applied by a previous run
+    if ledger and not args.force and device_jobs:
+        skipped = len(skip_unchanged(pusher, device_jobs, ledger, args.verify_unchanged))
+    
+    # Reject invalid payloads before they use push workers and NSO transactions
+    failed += len(run_preflight(pusher, device_jobs, args.preflight, args.workers))
+    
+    queued = sum(len(jobs) for jobs in device_jobs.values())
+    if args.check_only:
+        successful += queued
+        device_jobs.clear()
+    
+    # Push configuration: every file in one transaction
+    if device_jobs and args.batch:
+        jobs = [
+            (xml_file, device_name, xml_content)
+            for device_name, device_files in device_jobs.items()
+            for xml_file, xml_content in device_files
+        ]
+        print()
+        if pusher.push_batch(jobs):
+            successful += len(jobs)
         else:
-            failed += 1
+            failed += len(jobs)
+    
+    # Push configuration: one worker per device, devices in parallel
+    elif device_jobs:
+        workers = min(args.workers, len(device_jobs))
+        rate = f", max {args.rate:g} req/s" if args.rate else ""
+        print(f"\n🚀 Pushing {queued} payload(s) to {len(device_jobs)} device(s) with {workers} worker(s){rate}")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda item: pusher.push_device_queue(*item),
+                device_jobs.items()
+            )
+            # Results come back in device order, so the logs stay readable
+            for device_ok, device_failed, log_lines in results:
+                print("\n".join(log_lines))
+                successful += device_ok
+                failed += device_failed
+    
+    # Queued pushes only count once NSO has confirmed them applied to the devices
+    unconfirmed = 0
+    if args.async_push and pusher.queue_items:
+        results = pusher.wait_for_queue(args.poll_interval, args.queue_timeout)
+        for queue_id, status in results.items():
+            if status != 'completed':
+                files = pusher.queue_items[queue_id][1]
+                successful -= files
+                if status == 'unknown':
+                    unconfirmed += files
+                else:
+                    failed += files
     
     # Final summary
     print("\n" + "=" * 60)
     print("📊 FINAL SUMMARY")
     print("=" * 60)
     print(f"📁 Total files processed: {total_files}")
+    if queued != total_files:
+        print(f"📦 Device payloads queued: {queued}")
     print(f"✅ Successful: {successful}")
+    if skipped:
+        print(f"⏭️  Skipped (unchanged): {skipped}")
     print(f"❌ Failed: {failed}")
+    if unconfirmed:
+        print(f"❓ Not confirmed: {unconfirmed}")
+    print()
+    pusher.client.print_stats()
+    pusher.client.close()
+    if ledger and not args.check_only:
+        ledger.save()
     
-    if failed == 0:
+    if failed == 0 and args.check_only:
+        print("\n🎊 All configurations passed the pre-flight checks!")
+        print("=" * 60 + "\n")
+        sys.exit(0)
+    elif failed == 0 and unconfirmed:
+        print("\n⚠️  NSO could not confirm whether some queued configurations were applied")
+        print("=" * 60 + "\n")
+        sys.exit(1)
+    elif failed == 0:
         print("\n🎊 All configurations applied successfully!")
         print("=" * 60 + "\n")
         sys.exit(0)
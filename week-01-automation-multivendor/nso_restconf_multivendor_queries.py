@@ -9,13 +9,29 @@ and display results in beautiful ASCII tables.
 import argparse
 import json
 import sys
-from typing import Dict, List, Optional, Any
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any, Tuple, Iterable, Iterator
 
 import requests
 import urllib3
-from requests.auth import HTTPBasicAuth
 from tabulate import tabulate
 
+from nso_inventory_snapshot import (
+    DEFAULT_SNAPSHOT_FILE,
+    InventorySnapshot,
+    export_changes
+)
+from nso_platform_cache import DEFAULT_CACHE_FILE, PlatformCache
+from nso_restconf_client import RestconfClient
+from nso_vendor_parsers import HAS_IJSON, Interface, VendorParser, resolve_parser
+
+# Shared interface exporters (common/interface_export.py at the repository root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+from interface_export import EXPORT_FORMATS, HAS_PYARROW, InterfaceWriter, open_writer  # noqa: E402
+
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -28,12 +44,13 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 RESTCONF_URLS = {
     'test_connectivity': '/restconf/data/ietf-yang-library:yang-library',
     'get_devices': '/restconf/data/tailf-ncs:devices/device?fields=name',
-    'get_platform': '/restconf/data/tailf-ncs:devices/device={device}/device-type/{connection_type}/ned-id',
-    'get_interfaces_asa': '/restconf/data/tailf-ncs:devices/device={device}/config/tailf-ned-cisco-asa:interface',
-    'get_interfaces_iosxr': '/restconf/data/tailf-ncs:devices/device={device}/config/tailf-ned-cisco-ios-xr:interface',
-    'get_interfaces_juniper': '/restconf/data/tailf-ncs:devices/device={device}/config/junos:configuration/interfaces/interface',
-    'get_interfaces_fortinet': '/restconf/data/tailf-ncs:devices/device={device}/config/tailf-ned-fortinet-fortios:global/system/interface'
+    'get_platforms': '/restconf/data/tailf-ncs:devices/device?fields=name;device-type',
+    'get_platform': '/restconf/data/tailf-ncs:devices/device={device}/device-type/{connection_type}/ned-id'
 }
+# Interface URLs are owned by the vendor parsers (see nso_vendor_parsers.py)
+
+# Device connection types probed for a ned-id, in order of preference
+CONNECTION_TYPES = ['cli', 'netconf']
 
 VENDOR_ICONS = {
     'cisco': '🔷',
@@ -43,6 +60,10 @@ VENDOR_ICONS = {
 }
 
 
+class PlatformMismatchError(Exception):
+    """NSO rejected the interface path built for a device's ned-id (HTTP 400/404)."""
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -90,6 +111,10 @@ def parse_arguments() -> argparse.Namespace:
 Examples:
   %(prog)s --url nso.example.com --port 443 --username admin --password secret
   %(prog)s --url 192.168.1.100
+  %(prog)s --url 192.168.1.100 --workers 16 --max-in-flight 8
+  %(prog)s --url 192.168.1.100 --output parquet --output-file fleet.parquet
+  %(prog)s --url 192.168.1.100 --snapshot
+  %(prog)s --url 192.168.1.100 --diff
         """
     )
     
@@ -118,26 +143,107 @@ Examples:
         action='store_true',
         help='Enable verbose output'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of devices processed in parallel (default: 8)'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=None,
+        help='Maximum concurrent RESTCONF requests sent to NSO, also the connection pool size; a streamed '
+             'reply counts until it has been read (default: same as --workers)'
+    )
+    parser.add_argument(
+        '--discovery',
+        choices=['bulk', 'per-device'],
+        default='bulk',
+        help='Platform discovery: one bulk query for all devices, or one probe per device (default: bulk)'
+    )
+    parser.add_argument(
+        '--platform-cache',
+        default=str(DEFAULT_CACHE_FILE),
+        help=f'Platform (ned-id) cache file (default: {DEFAULT_CACHE_FILE})'
+    )
+    parser.add_argument(
+        '--platform-cache-ttl',
+        type=float,
+        default=24,
+        help='Hours a cached platform stays valid (default: 24)'
+    )
+    parser.add_argument(
+        '--refresh-platforms',
+        action='store_true',
+        help='Ignore cached platforms and discover them again'
+    )
+    parser.add_argument(
+        '--no-platform-cache',
+        action='store_true',
+        help='Neither read nor write the platform cache'
+    )
+    parser.add_argument(
+        '--no-stream',
+        action='store_true',
+        help='Load each interface payload fully before parsing it (the default incremental parsing requires ijson)'
+    )
+    parser.add_argument(
+        '--output',
+        choices=['table'] + EXPORT_FORMATS,
+        default='table',
+        help='Interface output: ASCII tables on screen, or a file in the given format (default: table)'
+    )
+    parser.add_argument(
+        '--output-file',
+        help='Export file for non-table output (default: interfaces.<format>)'
+    )
+    parser.add_argument(
+        '--diff',
+        action='store_true',
+        help='Only show (or export) interfaces added, removed or changed since the last snapshot, '
+             'then update the snapshot'
+    )
+    parser.add_argument(
+        '--snapshot',
+        nargs='?',
+        const=str(DEFAULT_SNAPSHOT_FILE),
+        default=None,
+        metavar='FILE',
+        help=f'Record an inventory snapshot for later --diff runs (default file: {DEFAULT_SNAPSHOT_FILE})'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Retries with backoff on connection errors and 5xx responses (default: 3)'
+    )
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.max_in_flight is None:
+        args.max_in_flight = args.workers
+    elif args.max_in_flight < 1:
+        parser.error('--max-in-flight must be at least 1')
+    if args.output == 'parquet' and not HAS_PYARROW:
+        parser.error('--output parquet requires pyarrow (pip install pyarrow)')
+    if args.diff and args.snapshot is None:
+        args.snapshot = str(DEFAULT_SNAPSHOT_FILE)
+    if args.diff and args.output == 'parquet':
+        parser.error('--diff can be exported as json, jsonl or csv only')
+    
+    return args
 
 
 # ============================================================================
 # API FUNCTIONS
 # ============================================================================
 
-def test_connectivity(base_url: str, auth: HTTPBasicAuth) -> bool:
+def test_connectivity(client: RestconfClient) -> bool:
     """Test RESTCONF connectivity to NSO."""
-    url = f"{base_url}{RESTCONF_URLS['test_connectivity']}"
-    
     try:
-        response = requests.get(
-            url,
-            auth=auth,
-            verify=False,
-            headers={'Accept': 'application/yang-data+json'},
-            timeout=10
-        )
+        response = client.get(RESTCONF_URLS['test_connectivity'])
         response.raise_for_status()
         print("✅ RESTCONF connectivity successful")
         return True
@@ -147,18 +253,10 @@ def test_connectivity(base_url: str, auth: HTTPBasicAuth) -> bool:
         return False
 
 
-def get_devices(base_url: str, auth: HTTPBasicAuth) -> Optional[List[str]]:
+def get_devices(client: RestconfClient) -> Optional[List[str]]:
     """Get all devices from NSO."""
-    url = f"{base_url}{RESTCONF_URLS['get_devices']}"
-    
     try:
-        response = requests.get(
-            url,
-            auth=auth,
-            verify=False,
-            headers={'Accept': 'application/yang-data+json'},
-            timeout=10
-        )
+        response = client.get(RESTCONF_URLS['get_devices'])
         response.raise_for_status()
         devices = response.json()
         device_list = [device['name'] for device in devices.get('tailf-ncs:device', [])]
@@ -171,18 +269,44 @@ def get_devices(base_url: str, auth: HTTPBasicAuth) -> Optional[List[str]]:
         return None
 
 
-def get_platform(base_url: str, auth: HTTPBasicAuth, device: str, connection_type: str) -> str:
+def get_platforms(client: RestconfClient) -> Optional[Dict[str, Tuple[str, str]]]:
+    """
+    Get the platform of every device from NSO with a single bulk query.
+    
+    Returns:
+        Ordered mapping of device name to (connection_type, ned-id), or None
+        if the bulk query failed. Devices without a known ned-id are mapped
+        to (None, None) so they can be probed individually.
+    """
+    try:
+        response = client.get(RESTCONF_URLS['get_platforms'])
+        response.raise_for_status()
+        devices = response.json()
+        
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"❌ Error getting device platforms: {e}")
+        return None
+    
+    platforms = {}
+    for device in devices.get('tailf-ncs:device', []):
+        device_type = device.get('device-type', {})
+        platforms[device['name']] = (None, None)
+        for connection_type in CONNECTION_TYPES:
+            ned_id = device_type.get(connection_type, {}).get('ned-id')
+            if ned_id:
+                platforms[device['name']] = (connection_type, ned_id)
+                break
+    
+    print(f"🧭 Bulk discovery returned the platform of {len(platforms)} device(s)")
+    return platforms
+
+
+def get_platform(client: RestconfClient, device: str, connection_type: str) -> str:
     """Get platform version for a specific device from NSO."""
-    url = f"{base_url}{RESTCONF_URLS['get_platform'].format(device=device, connection_type=connection_type)}"
+    path = RESTCONF_URLS['get_platform'].format(device=device, connection_type=connection_type)
     
     try:
-        response = requests.get(
-            url,
-            auth=auth,
-            verify=False,
-            headers={'Accept': 'application/yang-data+json'},
-            timeout=10
-        )
+        response = client.get(path)
         response.raise_for_status()
         return response.json()['tailf-ncs:ned-id']
         
@@ -190,190 +314,119 @@ def get_platform(base_url: str, auth: HTTPBasicAuth, device: str, connection_typ
         raise Exception(f"Error getting platform for device {device} via {connection_type}: {e}")
 
 
-def get_interfaces(base_url: str, auth: HTTPBasicAuth, device: str, platform: str) -> Optional[Dict]:
-    """Get interfaces for a specific device from NSO."""
-    platform_lower = platform.lower()
+class InterfaceRows:
+    """
+    Interface rows of one device reply, parsed while they are iterated.
+    
+    The reply is read (incrementally with stream=True) and each entry is
+    normalised only when the next row is requested, so the rows flow one by
+    one into the export file, the table and the summary. Iterating closes
+    the reply; an unparsable body raises from the iteration.
+    
+    A streamed reply holds its pooled connection until it is read, so it
+    also holds its in-flight request slot: close() gives it back (release).
+    """
+    
+    def __init__(self, client: RestconfClient, path: str, response: requests.Response,
+                 vendor_parser: VendorParser, device: str, stream: bool):
+        self.client = client
+        self.path = path
+        self.response = response
+        self.vendor_parser = vendor_parser
+        self.device = device
+        self.stream = stream
+        self.release: Optional[Callable[[], None]] = None
+    
+    def __iter__(self) -> Iterator[Interface]:
+        with self.response:
+            # An empty body is no data, whichever way it is parsed
+            if self.response.status_code == 204 or self.response.headers.get('Content-Length') == '0':
+                return
+            if self.stream:
+                self.response.raw.decode_content = True
+                yield from self.vendor_parser.iter_stream(self.response.raw, self.device)
+            elif self.response.content:
+                yield from self.vendor_parser.iter_parse(self.response.json(), self.device)
+    
+    def remember(self, digest: str) -> None:
+        """Remember the validators of the reply, once all its rows were parsed successfully"""
+        self.client.remember(self.path, self.response, digest)
+    
+    def close(self) -> None:
+        self.response.close()
+        if self.release is not None:
+            release, self.release = self.release, None
+            release()
+
+
+def get_interfaces(client: RestconfClient, device: str, platform: str, stream: bool = False,
+                   conditional: bool = False) -> Tuple[Optional[InterfaceRows], Optional[str], Optional[str]]:
+    """
+    Get interfaces for a specific device from NSO.
     
+    Only the status of the reply is checked here: its body is parsed by the
+    consumer of the returned InterfaceRows, one row at a time (incrementally
+    with stream=True, after loading the whole payload otherwise).
+    
+    With conditional=True the request carries the validators (ETag /
+    Last-Modified) remembered for the URL, and a 304 Not Modified answer
+    returns the digest remembered with them instead of rows: the caller
+    already holds that content (in the inventory snapshot).
+    
+    Runs in worker threads, so nothing is printed: request errors are
+    returned for the caller to report in device order.
+    
+    Returns:
+        Tuple of (rows or None, digest of the unchanged content on 304 or None,
+        error message or None)
+    """
     # Determine the correct URL based on platform
-    if 'asa' in platform_lower:
-        url = f"{base_url}{RESTCONF_URLS['get_interfaces_asa'].format(device=device)}"
-    elif 'iosxr' in platform_lower or 'ios-xr' in platform_lower:
-        url = f"{base_url}{RESTCONF_URLS['get_interfaces_iosxr'].format(device=device)}"
-    elif 'juniper' in platform_lower or 'junos' in platform_lower:
-        url = f"{base_url}{RESTCONF_URLS['get_interfaces_juniper'].format(device=device)}"
-    elif 'fortinet' in platform_lower or 'fortios' in platform_lower:
-        url = f"{base_url}{RESTCONF_URLS['get_interfaces_fortinet'].format(device=device)}"
-    else:
+    vendor_parser = resolve_parser(platform)
+    if vendor_parser is None:
         raise ValueError(f"⚠️  Unsupported device type: {platform}")
+    path = vendor_parser.interfaces_url(device)
     
     try:
-        response = requests.get(
-            url,
-            auth=auth,
-            verify=False,
-            headers={'Accept': 'application/yang-data+json'},
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
+        if conditional:
+            response, unchanged = client.get_conditional(path, stream=stream)
+            if unchanged is not None:
+                return None, unchanged, None
+        else:
+            response = client.get(path, stream=stream)
+        
+        if response.status_code in (400, 404):
+            response.close()
+            raise PlatformMismatchError(
+                f"Interface path for {platform} rejected on {device} (HTTP {response.status_code})"
+            )
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return InterfaceRows(client, path, response, vendor_parser, device, stream), None, None
         
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error getting interfaces for device {device}: {e}")
-        return None
+        return None, None, f"Error getting interfaces for device {device}: {e}"
+
+
+def interfaces_url(client: RestconfClient, device: str, platform: str) -> Optional[str]:
+    """Absolute URL of a device's interface list, as used for conditional requests."""
+    vendor_parser = resolve_parser(platform)
+    return client.url(vendor_parser.interfaces_url(device)) if vendor_parser else None
 
 
 # ============================================================================
 # DATA PROCESSING FUNCTIONS
 # ============================================================================
 
-def parse_interfaces(interface_data: Dict, platform: str, device: str) -> List[Dict[str, str]]:
+def parse_interfaces(interface_data: Dict, platform: str, device: str) -> List[Interface]:
     """Parse interface data into a standardized format with IP address extraction."""
-    interfaces = []
-    platform_lower = platform.lower()
-    
     try:
-        if 'asa' in platform_lower:
-            # Parse Cisco ASA interfaces
-            for int_type, int_list in interface_data.get('tailf-ned-cisco-asa:interface', {}).items():
-                if isinstance(int_list, list):
-                    for interface in int_list:
-                        # Extract IP address for ASA
-                        ip_address = ''
-                        if 'ip' in interface and 'address' in interface['ip']:
-                            addr_data = interface['ip']['address']
-                            if 'ip' in addr_data and 'host-ip' in addr_data['ip']:
-                                host_ip = addr_data['ip']['host-ip']
-                                # Check for subnet mask
-                                if 'mask' in addr_data.get('ip', {}):
-                                    mask = addr_data['ip']['mask']
-                                    ip_address = f"{host_ip} {mask}"
-                                else:
-                                    ip_address = host_ip
-                        
-                        # Build interface name
-                        interface_name = interface.get('name', interface.get('id', 'N/A'))
-                        if interface_name != 'N/A' and int_type:
-                            full_name = f"{int_type}{interface_name}"
-                        else:
-                            full_name = interface_name
-                        
-                        interfaces.append({
-                            'name': full_name,
-                            'type': int_type,
-                            'ip_address': ip_address,
-                            'status': 'Configured',
-                            'description': interface.get('description', '')
-                        })
-                        
-        elif 'iosxr' in platform_lower or 'ios-xr' in platform_lower:
-            # Parse Cisco IOS-XR interfaces
-            for int_type, int_list in interface_data.get('tailf-ned-cisco-ios-xr:interface', {}).items():
-                if isinstance(int_list, list):
-                    for interface in int_list:
-                        # Extract IP address for IOS-XR
-                        ip_address = ''
-                        if 'ipv4' in interface and 'address' in interface['ipv4']:
-                            addr_data = interface['ipv4']['address']
-                            ip = addr_data.get('ip', '')
-                            mask = addr_data.get('mask', '')
-                            if ip:
-                                ip_address = f"{ip} {mask}" if mask else ip
-                        
-                        # Build interface name
-                        interface_id = interface.get('id', 'N/A')
-                        if interface_id != 'N/A' and int_type:
-                            full_name = f"{int_type}{interface_id}"
-                        else:
-                            full_name = interface_id
-                        
-                        interfaces.append({
-                            'name': full_name,
-                            'type': int_type,
-                            'ip_address': ip_address,
-                            'status': 'Configured',
-                            'description': interface.get('description', '')
-                        })
-                        
-        elif 'juniper' in platform_lower or 'junos' in platform_lower:
-            # Parse Juniper interfaces
-            for interface in interface_data.get('junos:interface', []):
-                # Extract IP addresses from units
-                ip_addresses = []
-                if 'unit' in interface:
-                    for unit in interface['unit']:
-                        if 'family' in unit and 'inet' in unit['family']:
-                            inet_family = unit['family']['inet']
-                            if 'address' in inet_family:
-                                for addr in inet_family['address']:
-                                    if 'name' in addr:
-                                        ip_addresses.append(addr['name'])
-                
-                ip_address = ', '.join(ip_addresses) if ip_addresses else ''
-                
-                interfaces.append({
-                    'name': interface.get('name', 'N/A'),
-                    'type': 'Physical',
-                    'ip_address': ip_address,
-                    'status': 'Configured',
-                    'description': interface.get('description', '')
-                })
-                
-        elif 'fortinet' in platform_lower or 'fortios' in platform_lower:
-            # Parse Fortinet interfaces
-            fortinet_data = interface_data.get('tailf-ned-fortinet-fortios:interface', {})
-            
-            # Handle nested interface-list structure
-            if isinstance(fortinet_data, dict) and 'interface-list' in fortinet_data:
-                interface_list = fortinet_data['interface-list']
-            elif isinstance(fortinet_data, list):
-                interface_list = fortinet_data
-            else:
-                interface_list = []
-            
-            for interface in interface_list:
-                # Extract IP address for Fortinet
-                ip_address = ''
-                if 'ip' in interface and 'ip-mask' in interface['ip']:
-                    ip_mask = interface['ip']['ip-mask']
-                    class_ip = ip_mask.get('class_ip', '')
-                    net_mask = ip_mask.get('net_mask', '')
-                    if class_ip and net_mask:
-                        ip_address = f"{class_ip} {net_mask}"
-                    elif class_ip:
-                        ip_address = class_ip
-                
-                # Extract access information for description
-                access_info = ''
-                if 'allowaccess' in interface:
-                    access_list = interface['allowaccess']
-                    if isinstance(access_list, list):
-                        access_info = ', '.join(access_list)
-                    else:
-                        access_info = str(access_list)
-                
-                # Build description from available info
-                description_parts = []
-                if access_info:
-                    description_parts.append(f"Access: {access_info}")
-                if 'vdom' in interface:
-                    description_parts.append(f"VDOM: {interface['vdom']}")
-                if interface.get('description'):
-                    description_parts.append(interface['description'])
-                
-                description = ' | '.join(description_parts) if description_parts else ''
-                
-                interfaces.append({
-                    'name': interface.get('name', 'N/A'),
-                    'type': interface.get('type', 'N/A'),
-                    'ip_address': ip_address,
-                    'status': interface.get('status', 'unknown'),
-                    'description': description
-                })
-                
+        return resolve_parser(platform).parse(interface_data, device)
     except Exception as e:
         print(f"⚠️  Warning: Error parsing interfaces for {device}: {e}")
-    
-    return interfaces
+        return []
 
 
 def display_device_summary(devices_info: List[Dict[str, Any]]) -> None:
@@ -394,7 +447,7 @@ def display_device_summary(devices_info: List[Dict[str, Any]]) -> None:
     print(tabulate(table_data, headers=headers, tablefmt='fancy_grid'))
 
 
-def display_device_interfaces(device: str, platform: str, interfaces: List[Dict[str, str]]) -> None:
+def display_device_interfaces(device: str, platform: str, interfaces: List[Interface]) -> None:
     """Display interfaces for a specific device in an ASCII table."""
     icon = get_vendor_icon(platform)
     print_header(f"{icon} {device} - {platform}")
@@ -407,22 +460,22 @@ def display_device_interfaces(device: str, platform: str, interfaces: List[Dict[
     table_data = []
     for idx, interface in enumerate(interfaces, 1):
         # Truncate long descriptions and IP addresses intelligently
-        description = interface.get('description', '')
+        description = interface.description
         max_desc_length = 40
         if len(description) > max_desc_length:
             description = description[:max_desc_length-3] + '...'
         
-        ip_address = interface.get('ip_address', '')
+        ip_address = interface.ip_address
         max_ip_length = 30
         if len(ip_address) > max_ip_length:
             ip_address = ip_address[:max_ip_length-3] + '...'
         
         table_data.append([
             idx,
-            interface.get('name', 'N/A'),
-            interface.get('type', 'N/A'),
+            interface.name,
+            interface.type,
             ip_address if ip_address else '-',
-            interface.get('status', 'N/A'),
+            interface.status,
             description
         ])
     
@@ -431,6 +484,268 @@ def display_device_interfaces(device: str, platform: str, interfaces: List[Dict[
     print(f"\n💡 Total interfaces: {len(interfaces)}\n")
 
 
+def display_inventory_diff(changes: List[Dict[str, str]]) -> None:
+    """Display the interface changes since the last snapshot, one table per device."""
+    if not changes:
+        print("✅ No interface changes since the last snapshot.\n")
+        return
+    
+    icons = {'added': '➕', 'removed': '➖', 'changed': '✏️'}
+    by_device = {}
+    for change in changes:
+        by_device.setdefault(change['device'], []).append(change)
+    
+    for device, device_changes in by_device.items():
+        print_header(f"🔀 {device} - {len(device_changes)} change(s)")
+        table_data = [
+            [f"{icons[c['change']]} {c['change']}", c['interface'], c['field'] or '-', c['new'] or '-']
+            for c in device_changes
+        ]
+        headers = ['Change', 'Interface Name', 'Field', 'New Value']
+        print(tabulate(table_data, headers=headers, tablefmt='fancy_grid'))
+    print()
+
+
+def seed_validators(client: RestconfClient, snapshot: InventorySnapshot) -> None:
+    """
+    Prime the client's conditional-request cache with the validators and
+    digests of the previous run, so unchanged devices answer 304.
+    """
+    for device, entry in snapshot.previous.items():
+        url = interfaces_url(client, device, entry.get('platform', ''))
+        if url and entry.get('digest') and (entry.get('etag') or entry.get('last_modified')):
+            client.validators.set(url, entry.get('etag'), entry.get('last_modified'), entry['digest'])
+
+
+# ============================================================================
+# DEVICE PROCESSING
+# ============================================================================
+
+def probe_platform(client: RestconfClient, device_name: str,
+                   in_flight: threading.BoundedSemaphore) -> Optional[Tuple[str, str]]:
+    """Probe each connection type of a device until NSO returns its ned-id."""
+    for connection_type in CONNECTION_TYPES:
+        try:
+            with in_flight:
+                return connection_type, get_platform(client, device_name, connection_type)
+        except Exception:
+            continue
+    return None
+
+
+def process_device(client: RestconfClient, device_name: str,
+                   in_flight: threading.BoundedSemaphore,
+                   known_platform: Optional[Tuple[str, str]] = None,
+                   platform_cache: Optional[PlatformCache] = None,
+                   from_cache: bool = False,
+                   stream: bool = False,
+                   snapshot: Optional[InventorySnapshot] = None,
+                   conditional: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Discover the platform and retrieve the interfaces of a single device.
+    
+    When known_platform (connection_type, ned-id) comes from bulk discovery or
+    the platform cache, the per-device platform probes are skipped. A cached
+    platform whose interface path is rejected by NSO is invalidated and
+    re-discovered once.
+    
+    The interface reply is not read here: the entry carries it under 'rows'
+    (see InterfaceRows) for the caller to stream into its outputs with
+    emit_rows(), which sets the interface count and the final status. With
+    stream=True the payload is parsed incrementally instead of being loaded
+    as a whole.
+    
+    With conditional=True the interface fetch is a conditional GET (see
+    get_interfaces): a device answering 304 keeps its snapshot entry, or is
+    fetched again unconditionally when the snapshot does not hold the content
+    the validators were remembered for.
+    
+    Safe to run from worker threads: progress messages are collected and returned
+    instead of printed, so the caller can emit them in device order. Every RESTCONF
+    request is gated by the shared in_flight semaphore.
+    
+    Returns:
+        Tuple of (devices_info entry, progress log lines)
+    """
+    log_lines = [f"\n🔍 Processing device: {device_name}"]
+    
+    def device_entry(platform: str, status: str, interface_count: int = 0,
+                     rows: Optional[InterfaceRows] = None) -> Dict[str, Any]:
+        return {
+            'name': device_name,
+            'platform': platform,
+            'interface_count': interface_count,
+            'status': status,
+            'interfaces': [],
+            'rows': rows
+        }
+    
+    def discover() -> Optional[str]:
+        discovered = probe_platform(client, device_name, in_flight)
+        if not discovered:
+            log_lines.append(f"   ⚠️  Unable to determine platform for {device_name}")
+            return None
+        connection_type, ned_id = discovered
+        log_lines.append(f"   ✓ Platform detected: {ned_id} (via {connection_type})")
+        if platform_cache is not None:
+            platform_cache.set(device_name, connection_type, ned_id)
+        return ned_id
+    
+    # Get platform type
+    if known_platform and known_platform[1]:
+        connection_type, platform = known_platform
+        source = 'cache' if from_cache else 'bulk discovery'
+        log_lines.append(f"   ✓ Platform known: {platform} (via {connection_type}, {source})")
+        if platform_cache is not None and not from_cache:
+            platform_cache.set(device_name, connection_type, platform)
+    else:
+        platform = discover()
+    
+    if not platform:
+        return device_entry('Unknown', '❌ Failed'), log_lines
+    
+    def fetch_interfaces(conditional: bool) -> Tuple[Optional[InterfaceRows], Optional[str], Optional[str]]:
+        in_flight.acquire()
+        try:
+            result = get_interfaces(client, device_name, platform, stream=stream, conditional=conditional)
+        except BaseException:
+            in_flight.release()
+            raise
+        if result[0] is not None and stream:
+            # The reply is read later, by emit_rows: keep the slot until it is closed
+            result[0].release = in_flight.release
+        else:
+            in_flight.release()
+        return result
+    
+    # Get interfaces
+    try:
+        try:
+            result = fetch_interfaces(conditional)
+        except PlatformMismatchError as e:
+            if not from_cache:
+                raise
+            # The cached ned-id is stale: drop it and discover the platform again
+            log_lines.append(f"   ♻️  {e}, refreshing cached platform")
+            platform_cache.invalidate(device_name)
+            platform = discover()
+            if not platform:
+                return device_entry('Unknown', '❌ Failed'), log_lines
+            result = fetch_interfaces(conditional)
+        
+        rows, unchanged, error = result
+        if unchanged is not None:
+            previous = snapshot.get(device_name) if snapshot else None
+            if previous is not None and previous.get('digest') == unchanged:
+                snapshot.keep(device_name)
+                count = previous.get('count', 0)
+                log_lines.append(f"   ✓ Not modified since last query (HTTP 304), {count} interface(s)")
+                return device_entry(platform, '✅ Unchanged', count), log_lines
+            # Validators without the matching content: fetch it again
+            rows, unchanged, error = fetch_interfaces(False)
+        
+        if error:
+            log_lines.append(f"   ❌ {error}")
+        if rows is not None:
+            return device_entry(platform, '✅ Success', rows=rows), log_lines
+        
+        return device_entry(platform, '⚠️  No Data'), log_lines
+        
+    except PlatformMismatchError as e:
+        log_lines.append(f"   ❌ {e}")
+        return device_entry(platform, '⚠️  No Data'), log_lines
+    except ValueError as ve:
+        log_lines.append(f"   ⚠️  {ve}")
+        return device_entry(platform, '⚠️  Unsupported'), log_lines
+    except Exception as e:
+        log_lines.append(f"   ❌ Error processing {device_name}: {e}")
+        return device_entry(platform, '❌ Failed'), log_lines
+
+
+def emit_rows(device_info: Dict[str, Any], writer: Optional[InterfaceWriter] = None,
+              snapshot: Optional[InventorySnapshot] = None, keep: bool = False) -> None:
+    """
+    Stream the interface rows of a processed device into the outputs.
+    
+    Each row goes to the export writer and the snapshot inventory as soon as
+    it is parsed, and is counted for the summary; with keep=True the rows are
+    also collected for the device table. Runs in the main thread, after the
+    device's progress lines. Whichever way the payload is parsed, a reply
+    without interfaces is '⚠️  No Data' and an unparsable one '❌ Failed'.
+    A successfully parsed reply is recorded in the snapshot even without
+    interfaces, so interfaces that all disappeared are reported as removed.
+    """
+    rows = device_info.pop('rows', None)
+    if rows is None:
+        return
+    device = device_info['name']
+    inventory = snapshot.begin(device) if snapshot else None
+    interfaces = device_info['interfaces'] if keep else None
+    count = 0
+    
+    try:
+        for interface in rows:
+            count += 1
+            if writer:
+                writer.write(interface)
+            if inventory is not None:
+                inventory.add(interface)
+            if interfaces is not None:
+                interfaces.append(interface)
+    except Exception as e:
+        print(f"   ❌ Error parsing interfaces for {device}: {e}")
+        device_info['status'] = '❌ Failed'
+        return
+    finally:
+        rows.close()
+        device_info['interface_count'] = count
+    
+    if count:
+        print(f"   ✓ Retrieved {count} interface(s)")
+    else:
+        device_info['status'] = '⚠️  No Data'
+    if inventory is not None:
+        headers = rows.response.headers
+        snapshot.record(device, device_info['platform'], inventory, headers.get('ETag'), headers.get('Last-Modified'))
+        rows.remember(inventory.digest)
+
+
+def ordered_results(executor: ThreadPoolExecutor, function: Callable[[str], Any],
+                    items: Iterable[str], window: int,
+                    discard: Optional[Callable[[Any], None]] = None) -> Iterator[Any]:
+    """
+    Run function over items in the pool and yield the results in item order,
+    with at most `window` items submitted and not yet consumed (so at most
+    that many interface replies are held open while earlier ones are read).
+    
+    If the consumer stops early, the items not started are cancelled and the
+    results of the others are passed to discard, to free what they hold.
+    """
+    pending: deque[Future] = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            if future.cancel() or discard is None:
+                continue
+            try:
+                discard(future.result())
+            except Exception:
+                pass
+
+
+def discard_rows(result: Tuple[Dict[str, Any], List[str]]) -> None:
+    """Close the unread interface reply of a process_device result"""
+    rows = result[0].pop('rows', None)
+    if rows is not None:
+        rows.close()
+
+
 # ============================================================================
 # MAIN FUNCTION
 # ============================================================================
@@ -444,98 +759,149 @@ def main() -> int:
     
     # Build base URL
     base_url = f"http://{args.url}:{args.port}"
-    auth = HTTPBasicAuth(args.username, args.password)
+    client = RestconfClient(
+        base_url,
+        args.username,
+        args.password,
+        pool_size=args.max_in_flight,
+        retries=args.retries,
+        verify=False
+    )
     
     print(f"🔗 Connecting to NSO at {base_url}")
     print(f"👤 Username: {args.username}")
     
     # Test connectivity
     print_header("🔌 CONNECTIVITY TEST")
-    if not test_connectivity(base_url, auth):
+    if not test_connectivity(client):
         print("\n❌ Failed to connect to NSO. Please check your credentials and URL.\n")
         return 1
     
-    # Get devices
+    # Get devices (and their platforms from the cache or in bulk mode)
     print_header("📡 RETRIEVING DEVICES")
-    device_list = get_devices(base_url, auth)
+    platform_cache = None
+    if not args.no_platform_cache:
+        platform_cache = PlatformCache(args.platform_cache, base_url, args.platform_cache_ttl * 3600)
+    
+    device_list = None
+    platforms = {}
+    cached_devices = set()
+    if platform_cache and not args.refresh_platforms:
+        device_list = get_devices(client)
+        if device_list:
+            platforms = platform_cache.lookup(device_list)
+            cached_devices = set(platforms)
+            print(f"💾 {len(platforms)}/{len(device_list)} platform(s) loaded from cache")
+    
+    if args.discovery == 'bulk' and (device_list is None or len(platforms) < len(device_list)):
+        bulk_platforms = get_platforms(client)
+        if bulk_platforms is None:
+            print("↩️  Falling back to per-device platform discovery")
+        else:
+            if device_list is None:
+                device_list = list(bulk_platforms)
+            for name, platform in bulk_platforms.items():
+                platforms.setdefault(name, platform)
+    
+    if device_list is None:
+        device_list = get_devices(client)
     
     if not device_list:
         print("\n⚠️  No devices found or unable to retrieve device list.\n")
         return 1
     
-    # Process each device
+    # Process devices in parallel, keeping the original device order
+    print(f"\n⚡ Processing {len(device_list)} device(s) with {args.workers} worker(s), "
+          f"max {args.max_in_flight} request(s) in flight")
+    in_flight = threading.BoundedSemaphore(args.max_in_flight)
+    stream = HAS_IJSON and not args.no_stream
+    if not HAS_IJSON and not args.no_stream:
+        print("💡 Install ijson to parse large interface payloads incrementally")
     devices_info = []
     
-    for device_name in device_list:
-        print(f"\n🔍 Processing device: {device_name}")
-        
-        # Get platform type
-        platform = None
-        for connection_type in ['cli', 'netconf']:
+    # The snapshot is opt-in (--snapshot or --diff) and only keeps per-interface fingerprints
+    snapshot = None
+    if args.snapshot:
+        snapshot = InventorySnapshot(args.snapshot, base_url, track_changes=args.diff)
+    # Conditional GETs only when the rows of unchanged devices are not needed
+    conditional = args.diff
+    if conditional:
+        seed_validators(client, snapshot)
+    
+    # Interface rows are streamed to the export file as they are parsed
+    writer = None
+    if args.output != 'table' and not args.diff:
+        writer = open_writer(args.output, args.output_file)
+    
+    # Replies are read in the main thread, in device order, while later devices are fetched.
+    # A streamed reply keeps its in-flight slot until read, so no more devices than
+    # slots may wait to be read: the device at the head of the order always gets one.
+    window = min(args.workers, args.max_in_flight) if stream else args.workers
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = ordered_results(
+                executor,
+                lambda device_name: process_device(
+                    client,
+                    device_name,
+                    in_flight,
+                    platforms.get(device_name),
+                    platform_cache,
+                    device_name in cached_devices,
+                    stream,
+                    snapshot,
+                    conditional
+                ),
+                device_list,
+                window,
+                discard_rows
+            )
             try:
-                platform = get_platform(base_url, auth, device_name, connection_type)
-                print(f"   ✓ Platform detected: {platform} (via {connection_type})")
-                break
-            except Exception:
-                continue
-        
-        if not platform:
-            print(f"   ⚠️  Unable to determine platform for {device_name}")
-            devices_info.append({
-                'name': device_name,
-                'platform': 'Unknown',
-                'interface_count': 0,
-                'status': '❌ Failed',
-                'interfaces': []
-            })
-            continue
-        
-        # Get interfaces
-        try:
-            interface_data = get_interfaces(base_url, auth, device_name, platform)
-            
-            if interface_data:
-                interfaces = parse_interfaces(interface_data, platform, device_name)
-                print(f"   ✓ Retrieved {len(interfaces)} interface(s)")
-                
-                devices_info.append({
-                    'name': device_name,
-                    'platform': platform,
-                    'interface_count': len(interfaces),
-                    'status': '✅ Success',
-                    'interfaces': interfaces
-                })
-            else:
-                devices_info.append({
-                    'name': device_name,
-                    'platform': platform,
-                    'interface_count': 0,
-                    'status': '⚠️  No Data',
-                    'interfaces': []
-                })
-                
-        except ValueError as ve:
-            print(f"   ⚠️  {ve}")
-            devices_info.append({
-                'name': device_name,
-                'platform': platform,
-                'interface_count': 0,
-                'status': '⚠️  Unsupported',
-                'interfaces': []
-            })
+                for device_info, log_lines in results:
+                    print("\n".join(log_lines))
+                    emit_rows(device_info, writer, snapshot, keep=args.output == 'table' and not args.diff)
+                    devices_info.append(device_info)
+            finally:
+                # On errors: free the slots of the replies left unread before the pool shuts down
+                results.close()
+    finally:
+        # Also on errors: flush the rows written so far into a well-formed file
+        if writer:
+            writer.close()
+    
+    if platform_cache:
+        platform_cache.save()
     
     # Display results
     print("\n")
     display_device_summary(devices_info)
     
-    print_header("🔍 DETAILED INTERFACE INFORMATION")
-    for device_info in devices_info:
-        if device_info['interfaces']:
-            display_device_interfaces(
-                device_info['name'],
-                device_info['platform'],
-                device_info['interfaces']
-            )
+    if snapshot:
+        snapshot.carry_over(device_list)
+    
+    if args.diff:
+        changes = snapshot.changes()
+        print_header(f"🔀 CHANGES SINCE LAST SNAPSHOT ({len(changes)})")
+        if args.output == 'table':
+            display_inventory_diff(changes)
+        else:
+            path = export_changes(changes, args.output, args.output_file)
+            print(f"✅ Wrote {len(changes)} change(s) to {path} ({args.output})")
+    elif writer:
+        print_header("💾 INTERFACE EXPORT")
+        print(f"✅ Wrote {writer.count} interface(s) to {writer.path} ({args.output})")
+    else:
+        print_header("🔍 DETAILED INTERFACE INFORMATION")
+        for device_info in devices_info:
+            if device_info['interfaces']:
+                display_device_interfaces(
+                    device_info['name'],
+                    device_info['platform'],
+                    device_info['interfaces']
+                )
+    
+    if snapshot:
+        snapshot.save()
     
     # Final summary
     print_header("✨ QUERY COMPLETE")
@@ -547,7 +913,10 @@ def main() -> int:
        • Total Devices Queried: {len(devices_info)}
        • Successful Queries: {successful_devices}
        • Total Interfaces Found: {total_interfaces}
-    
+    """)
+    client.print_stats()
+    client.close()
+    print("""
     🎉 Query completed successfully!
     """)
     
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+NSO Vendor Interface Parsers
+============================
+Registry of vendor parser plugins for the NSO RESTCONF query tool.
+
+Each plugin owns the RESTCONF URL of its interface list, the JSON paths of
+the interface entries in the payload, and the function that normalises one
+entry into an interface row. Plugins are resolved once per ned-id.
+
+Additional NEDs can be supported without editing this file by exposing a
+VendorParser (or a callable returning one) under the 'nso_restconf.vendor_parsers'
+entry point group:
+
+    [project.entry-points."nso_restconf.vendor_parsers"]
+    nokia_sros = "my_package.parsers:NOKIA_SROS_PARSER"
+"""
+
+import sys
+import threading
+from functools import lru_cache
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# Shared normalised interface record (common/interface_model.py at the repository root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+from interface_model import Interface  # noqa: E402
+
+
+ENTRY_POINT_GROUP = 'nso_restconf.vendor_parsers'
+
+
+class VendorParser:
+    """Interface URL, payload layout and row normalisation for one vendor NED family"""
+
+    def __init__(self, name: str, ned_patterns: Sequence[str], url_template: str,
+                 entry_paths: Sequence[Tuple[str, ...]],
+                 parse_interface: Callable[[str, Dict], Interface]):
+        """
+        Args:
+            name: Short vendor family name (e.g. 'iosxr')
+            ned_patterns: Substrings of a ned-id handled by this parser
+            url_template: RESTCONF path of the interface list, with a {device} placeholder
+            entry_paths: JSON paths of the interface entries in the payload;
+                         '*' matches any key (its value is passed as the interface
+                         type) and 'item' matches a list element
+            parse_interface: Function (interface type, raw entry) -> Interface
+        """
+        self.name = name
+        self.ned_patterns = tuple(pattern.lower() for pattern in ned_patterns)
+        self.url_template = url_template
+        self.entry_paths = [tuple(path) for path in entry_paths]
+        self.parse_interface = parse_interface
+
+    def __repr__(self) -> str:
+        return f"VendorParser({self.name!r})"
+
+    def matches(self, ned_id: str) -> bool:
+        ned_id = ned_id.lower()
+        return any(pattern in ned_id for pattern in self.ned_patterns)
+
+    def interfaces_url(self, device: str) -> str:
+        return self.url_template.format(device=device)
+
+    def iter_entries(self, interface_data: Any) -> Iterator[Tuple[str, Dict]]:
+        """Yield (interface type, raw entry) from a fully parsed payload"""
+        for entry_path in self.entry_paths:
+            yield from _walk(interface_data, entry_path, '')
+
+    def _parse_entry(self, int_type: str, entry: Dict, device: str) -> Interface:
+        interface = self.parse_interface(int_type, entry)
+        interface.vendor = self.name
+        interface.device = device
+        return interface
+
+    def parse(self, interface_data: Dict, device: str = '') -> List[Interface]:
+        """Normalise every interface of a fully parsed payload"""
+        return list(self.iter_parse(interface_data, device))
+
+    def iter_parse(self, interface_data: Dict, device: str = '') -> Iterator[Interface]:
+        """Normalise the interfaces of a fully parsed payload one at a time"""
+        for int_type, entry in self.iter_entries(interface_data):
+            yield self._parse_entry(int_type, entry, device)
+
+    def iter_stream(self, stream: BinaryIO, device: str = '') -> Iterator[Interface]:
+        """
+        Incrementally parse a payload and yield one Interface per entry,
+        without ever materialising the whole JSON document.
+        
+        Requires ijson. Only one raw interface entry is held in memory at a time.
+        """
+        # path holds the current key for every open object and 'item' for every open list
+        path = []
+        builder = None
+        depth = 0
+
+        for event, value in ijson.basic_parse(stream):
+            if builder is not None:
+                builder.event(event, value)
+                if event in ('start_map', 'start_array'):
+                    depth += 1
+                elif event in ('end_map', 'end_array'):
+                    depth -= 1
+                    if depth == 0:
+                        yield self._parse_entry(int_type, builder.value, device)
+                        builder = None
+                continue
+
+            if event == 'start_map':
+                if path and path[-1] == 'item':
+                    entry_path = next((p for p in self.entry_paths if _path_matches(path, p)), None)
+                    if entry_path:
+                        int_type = next((k for k, p in zip(path, entry_path) if p == '*'), '')
+                        builder = ObjectBuilder()
+                        builder.event(event, value)
+                        depth = 1
+                        continue
+                path.append(None)
+            elif event == 'map_key':
+                path[-1] = value
+            elif event == 'start_array':
+                path.append('item')
+            elif event in ('end_map', 'end_array'):
+                path.pop()
+
+
+def _path_matches(path: List[str], pattern: Tuple[str, ...]) -> bool:
+    return len(path) == len(pattern) and all(p == '*' or p == k for k, p in zip(path, pattern))
+
+
+def _walk(node: Any, path: Tuple[str, ...], int_type: str) -> Iterator[Tuple[str, Dict]]:
+    if not path:
+        if isinstance(node, dict):
+            yield int_type, node
+        return
+    step, rest = path[0], path[1:]
+    if step == 'item':
+        if isinstance(node, list):
+            for element in node:
+                yield from _walk(element, rest, int_type)
+    elif isinstance(node, dict):
+        if step == '*':
+            for key, child in node.items():
+                yield from _walk(child, rest, key)
+        elif step in node:
+            yield from _walk(node[step], rest, int_type)
+
+
+# ============================================================================
+# BUILT-IN VENDOR PARSERS
+# ============================================================================
+
+def parse_asa_interface(int_type: str, interface: Dict) -> Interface:
+    """Normalise one Cisco ASA interface entry."""
+    # Extract IP address for ASA
+    ip_address = ''
+    if 'ip' in interface and 'address' in interface['ip']:
+        addr_data = interface['ip']['address']
+        if 'ip' in addr_data and 'host-ip' in addr_data['ip']:
+            host_ip = addr_data['ip']['host-ip']
+            # Check for subnet mask
+            if 'mask' in addr_data.get('ip', {}):
+                mask = addr_data['ip']['mask']
+                ip_address = f"{host_ip} {mask}"
+            else:
+                ip_address = host_ip
+    
+    # Build interface name
+    interface_name = interface.get('name', interface.get('id', 'N/A'))
+    if interface_name != 'N/A' and int_type:
+        full_name = f"{int_type}{interface_name}"
+    else:
+        full_name = interface_name
+    
+    return Interface(
+        name=full_name,
+        type=int_type,
+        ip_address=ip_address,
+        status='Configured',
+        description=interface.get('description', '')
+    )
+
+
+def parse_iosxr_interface(int_type: str, interface: Dict) -> Interface:
+    """Normalise one Cisco IOS-XR interface entry."""
+    # Extract IP address for IOS-XR
+    ip_address = ''
+    if 'ipv4' in interface and 'address' in interface['ipv4']:
+        addr_data = interface['ipv4']['address']
+        ip = addr_data.get('ip', '')
+        mask = addr_data.get('mask', '')
+        if ip:
+            ip_address = f"{ip} {mask}" if mask else ip
+    
+    # Build interface name
+    interface_id = interface.get('id', 'N/A')
+    if interface_id != 'N/A' and int_type:
+        full_name = f"{int_type}{interface_id}"
+    else:
+        full_name = interface_id
+    
+    return Interface(
+        name=full_name,
+        type=int_type,
+        ip_address=ip_address,
+        status='Configured',
+        description=interface.get('description', '')
+    )
+
+
+def parse_juniper_interface(int_type: str, interface: Dict) -> Interface:
+    """Normalise one Juniper Junos interface entry."""
+    # Extract IP addresses from units
+    ip_addresses = []
+    if 'unit' in interface:
+        for unit in interface['unit']:
+            if 'family' in unit and 'inet' in unit['family']:
+                inet_family = unit['family']['inet']
+                if 'address' in inet_family:
+                    for addr in inet_family['address']:
+                        if 'name' in addr:
+                            ip_addresses.append(addr['name'])
+    
+    ip_address = ', '.join(ip_addresses) if ip_addresses else ''
+    
+    return Interface(
+        name=interface.get('name', 'N/A'),
+        type='Physical',
+        ip_address=ip_address,
+        status='Configured',
+        description=interface.get('description', '')
+    )
+
+
+def parse_fortinet_interface(int_type: str, interface: Dict) -> Interface:
+    """Normalise one Fortinet FortiOS interface entry."""
+    # Extract IP address for Fortinet
+    ip_address = ''
+    if 'ip' in interface and 'ip-mask' in interface['ip']:
+        ip_mask = interface['ip']['ip-mask']
+        class_ip = ip_mask.get('class_ip', '')
+        net_mask = ip_mask.get('net_mask', '')
+        if class_ip and net_mask:
+            ip_address = f"{class_ip} {net_mask}"
+        elif class_ip:
+            ip_address = class_ip
+    
+    # Extract access information for description
+    access_info = ''
+    if 'allowaccess' in interface:
+        access_list = interface['allowaccess']
+        if isinstance(access_list, list):
+            access_info = ', '.join(access_list)
+        else:
+            access_info = str(access_list)
+    
+    # Build description from available info
+    description_parts = []
+    if access_info:
+        description_parts.append(f"Access: {access_info}")
+    if 'vdom' in interface:
+        description_parts.append(f"VDOM: {interface['vdom']}")
+    if interface.get('description'):
+        description_parts.append(interface['description'])
+    
+    description = ' | '.join(description_parts) if description_parts else ''
+    
+    return Interface(
+        name=interface.get('name', 'N/A'),
+        type=interface.get('type', 'N/A'),
+        ip_address=ip_address,
+        status=interface.get('status', 'unknown'),
+        description=description
+    )
+
+
+BUILTIN_PARSERS = [
+    VendorParser(
+        'asa',
+        ['asa'],
+        '/restconf/data/tailf-ncs:devices/device={device}/config/tailf-ned-cisco-asa:interface',
+        [('tailf-ned-cisco-asa:interface', '*', 'item')],
+        parse_asa_interface
+    ),
+    VendorParser(
+        'iosxr',
+        ['iosxr', 'ios-xr'],
+        '/restconf/data/tailf-ncs:devices/device={device}/config/tailf-ned-cisco-ios-xr:interface',
+        [('tailf-ned-cisco-ios-xr:interface', '*', 'item')],
+        parse_iosxr_interface
+    ),
+    VendorParser(
+        'juniper',
+        ['juniper', 'junos'],
+        '/restconf/data/tailf-ncs:devices/device={device}/config/junos:configuration/interfaces/interface',
+        [('junos:interface', 'item')],
+        parse_juniper_interface
+    ),
+    VendorParser(
+        'fortinet',
+        ['fortinet', 'fortios'],
+        '/restconf/data/tailf-ncs:devices/device={device}/config/tailf-ned-fortinet-fortios:global/system/interface',
+        [
+            ('tailf-ned-fortinet-fortios:interface', 'interface-list', 'item'),
+            ('tailf-ned-fortinet-fortios:interface', 'item')
+        ],
+        parse_fortinet_interface
+    )
+]
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+_registry: List[VendorParser] = list(BUILTIN_PARSERS)
+_plugins_loaded = False
+_plugins_lock = threading.Lock()
+
+
+def register_parser(parser: VendorParser) -> None:
+    """Register a vendor parser; it takes precedence over previously registered ones."""
+    _registry.insert(0, parser)
+    resolve_parser.cache_clear()
+
+
+def load_plugins() -> None:
+    """
+    Register the parsers published under the entry point group (once).
+    
+    The first calls come from worker threads: they wait for the loading
+    thread, so no ned-id is resolved (and cached) against the built-in
+    parsers alone.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    with _plugins_lock:
+        if _plugins_loaded:
+            return
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                plugin = entry_point.load()
+                register_parser(plugin() if callable(plugin) and not isinstance(plugin, VendorParser) else plugin)
+            except Exception as e:
+                print(f"⚠️  Unable to load vendor parser plugin '{entry_point.name}': {e}")
+        _plugins_loaded = True
+
+
+@lru_cache(maxsize=None)
+def resolve_parser(ned_id: str) -> Optional[VendorParser]:
+    """Return the parser handling a ned-id, or None if the platform is unsupported."""
+    load_plugins()
+    return next((parser for parser in _registry if parser.matches(ned_id)), None)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+NSO XML Payloads
+================
+Streaming loader for the XML configuration files pushed by the config pusher.
+
+Files are read with iterparse instead of being loaded as one string:
+
+- RESTCONF format (<config xmlns="http://tail-f.com/ns/ncs">, no device
+  wrapper): the file names no device (-d/--device gives it) and parsing
+  stops after the first element; the body is later streamed from the file.
+- CLI / load-merge format (<devices><device><name>...<config>...): the file is
+  split into one RESTCONF payload per device, named by the <name> child of
+  its <device> element, each device element being freed as soon as it has
+  been serialised.
+"""
+
+import hashlib
+import io
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+
+NCS_NS = 'http://tail-f.com/ns/ncs'
+DEVICES_TAG = f'{{{NCS_NS}}}devices'
+DEVICE_TAG = f'{{{NCS_NS}}}device'
+NAME_TAG = f'{{{NCS_NS}}}name'
+CONFIG_TAG = f'{{{NCS_NS}}}config'
+
+CHUNK_SIZE = 64 * 1024
+XML_DECLARATION = re.compile(rb'^\s*<\?xml[^>]*\?>\s*')
+
+
+class XmlPayload:
+    """Configuration body of one device, backed by a file on disk or by serialised bytes"""
+
+    __slots__ = ('source', 'device', 'path', 'data', '_digest')
+
+    def __init__(self, source: str, device: Optional[str],
+                 path: Optional[Path] = None, data: Optional[bytes] = None):
+        """
+        Args:
+            source: File the payload was loaded from
+            device: Target device name found in the XML (None if absent)
+            path: File streamed as the body (whole-file payloads)
+            data: Serialised body (payloads split out of a multi-device file)
+        """
+        self.source = source
+        self.device = device
+        self.path = path
+        self.data = data
+        self._digest = None
+
+    @property
+    def size(self) -> int:
+        return len(self.data) if self.data is not None else self.path.stat().st_size
+
+    def open(self) -> BinaryIO:
+        """Open the body as a binary file object, suitable as a requests body"""
+        return io.BytesIO(self.data) if self.data is not None else open(self.path, 'rb')
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE, strip_declaration: bool = False) -> Iterator[bytes]:
+        """
+        Yield the body in chunks
+
+        Args:
+            chunk_size: Chunk size in bytes
+            strip_declaration: Drop a leading <?xml ...?> declaration, for
+                               embedding the payload in another document
+        """
+        with self.open() as f:
+            chunk = f.read(chunk_size)
+            if strip_declaration:
+                chunk = XML_DECLARATION.sub(b'', chunk, count=1)
+            while chunk:
+                yield chunk
+                chunk = f.read(chunk_size)
+
+    def sha256(self) -> str:
+        """Return the SHA-256 hex digest of the body (computed once, streamed)"""
+        if self._digest is None:
+            digest = hashlib.sha256()
+            for chunk in self.iter_chunks():
+                digest.update(chunk)
+            self._digest = digest.hexdigest()
+        return self._digest
+
+    def preview(self, length: int = 500) -> str:
+        """Return the first characters of the body"""
+        with self.open() as f:
+            return f.read(length * 4).decode('utf-8', errors='replace')[:length]
+
+
+def iter_payloads(path: Union[str, Path]) -> Iterator[XmlPayload]:
+    """
+    Stream the device payloads of an XML configuration file
+
+    Args:
+        path: XML file in RESTCONF format or in CLI (devices/device) format
+
+    Yields:
+        One XmlPayload for a RESTCONF-format file, one per device for a
+        CLI-format file
+
+    Raises:
+        xml.etree.ElementTree.ParseError: The file is not well-formed XML
+    """
+    path = Path(path)
+    source = str(path)
+    context = ET.iterparse(str(path), events=('start', 'end'))
+    devices = None
+    depth = 0
+
+    for event, elem in context:
+        if devices is None:
+            if event == 'end':
+                depth -= 1
+                elem.clear()
+                continue
+            if elem.tag == DEVICES_TAG and depth <= 1:
+                devices = elem
+                continue
+            if depth == 1:
+                # RESTCONF format: no device wrapper, so no device name in the
+                # file (a <name> in the body names an interface, not the
+                # device); the rest of the file is not parsed
+                yield XmlPayload(source, None, path=path)
+                return
+            depth += 1
+            continue
+
+        if event == 'end' and elem.tag == DEVICE_TAG:
+            name = (elem.findtext(NAME_TAG) or '').strip() or None
+            config = elem.find(CONFIG_TAG)
+            if config is not None:
+                config.tail = None
+                yield XmlPayload(source, name, data=ET.tostring(config, encoding='utf-8', xml_declaration=False))
+            devices.remove(elem)
+
+    if devices is None:
+        # Empty root element: a payload without a device name
+        yield XmlPayload(source, None, path=path)
+
+
+def check_payload(payload: XmlPayload) -> List[str]:
+    """
+    Check a payload locally, streaming it with iterparse
+
+    Only the structure is checked: the body must be well-formed XML whose
+    root is the RESTCONF <config xmlns="http://tail-f.com/ns/ncs"> element.
+    Whether NSO and the device NED accept the content is left to a dry-run.
+
+    Args:
+        payload: Payload to check
+
+    Returns:
+        List of problems found (empty when the payload looks valid)
+    """
+    problems = []
+    root = None
+
+    try:
+        with payload.open() as f:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'end':
+                    elem.clear()
+                    continue
+                if root is None:
+                    root = elem
+                    if elem.tag != CONFIG_TAG:
+                        problems.append(f'root element is <{_local_name(elem.tag)}>, expected <config xmlns="{NCS_NS}">')
+    except ET.ParseError as e:
+        problems.append(f"not well-formed XML: {e}")
+
+    return problems
+
+
+def iter_body(parts: Iterable[Union[str, bytes, XmlPayload]]) -> Iterator[bytes]:
+    """
+    Concatenate text fragments and payload bodies into one streamed body
+
+    Payload bodies are embedded without their XML declaration, which makes the
+    generator suitable as a chunked requests body for wrapper documents.
+    """
+    for part in parts:
+        if isinstance(part, XmlPayload):
+            yield from part.iter_chunks(strip_declaration=True)
+        elif isinstance(part, str):
+            yield part.encode('utf-8')
+        else:
+            yield part
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
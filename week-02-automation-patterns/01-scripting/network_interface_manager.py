@@ -8,8 +8,23 @@ Network Interface Manager - A gNMI/OpenConfig-based script for managing network
 import argparse
 import sys
 import json
+import time
+from pathlib import Path
 from pygnmi.client import gNMIclient
 
+# Shared interface record and gNMI collector (common/ at the repository root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'common'))
+from gnmi_collector import (  # noqa: E402
+    DEFAULT_TIMEOUT,
+    DEFAULT_WORKERS,
+    GnmiTarget,
+    collect_interfaces,
+    load_targets,
+    parse_openconfig_interfaces
+)
+from gnmi_telemetry import DEFAULT_SAMPLE_INTERVAL, SUBSCRIPTION_MODES, TelemetryCollector  # noqa: E402
+from interface_export import EXPORT_FORMATS, open_writer  # noqa: E402
+
 
 def create_device_connection(host, username, password, port=57400):
     """
@@ -67,55 +82,17 @@ def retrieve_interfaces(connection):
         print("-" * 60 + "\n")
         
         # Parse and display the response
-        if response and 'notification' in response:
+        interfaces = parse_interfaces(response)
+        if interfaces:
             print(f"{'Interface':<30} {'IP Address':<20} {'Status':<12} {'Description'}")
             print("═" * 100)
             
-            interface_count = 0
-            for notification in response['notification']:
-                if 'update' in notification:
-                    for update in notification['update']:
-                        if 'val' in update:
-                            # Each update contains one interface directly in val
-                            interface = update['val']
-                            
-                            # Get interface name
-                            name = interface.get('name', 'N/A')
-                            
-                            # Get state information (gNMI uses 'state' for operational data)
-                            state = interface.get('state', {})
-                            config = interface.get('config', {})
-                            
-                            # Try state first, then config for description and enabled
-                            description = state.get('description', '') or config.get('description', '')
-                            enabled = state.get('enabled', config.get('enabled', False))
-                            status = '✓ up' if enabled else '✗ down'
-                            
-                            # Get IP address information from subinterfaces
-                            ip_text = 'N/A'
-                            subinterfaces = interface.get('subinterfaces', {}).get('subinterface', [])
-                            for subif in subinterfaces:
-                                ipv4 = subif.get('openconfig-if-ip:ipv4', {}) or subif.get('ipv4', {})
-                                addresses = ipv4.get('addresses', {}).get('address', [])
-                                if addresses:
-                                    addr = addresses[0]
-                                    ip = addr.get('ip', '')
-                                    # Try state first, then config for IP details
-                                    addr_state = addr.get('state', {})
-                                    addr_config = addr.get('config', {})
-                                    prefix_len = addr_state.get('prefix-length', '') or addr_config.get('prefix-length', '')
-                                    if ip and prefix_len:
-                                        ip_text = f"{ip}/{prefix_len}"
-                                    break
-                            
-                            print(f"{name:<30} {ip_text:<20} {status:<12} {description}")
-                            interface_count += 1
+            for interface in interfaces:
+                status = '✓ up' if interface.admin_status == 'UP' else '✗ down'
+                print(f"{interface.name:<30} {interface.ip_address:<20} {status:<12} {interface.description}")
             
             print("─" * 100)
-            print(f"\n📊 Total interfaces: {interface_count}\n")
-            
-            if interface_count == 0:
-                print("ℹ️  No interfaces found.")
+            print(f"\n📊 Total interfaces: {len(interfaces)}\n")
         else:
             print("ℹ️  No interfaces found.")
             
@@ -123,6 +100,121 @@ def retrieve_interfaces(connection):
         print(f"❌ Error retrieving interfaces: {e}")
 
 
+def parse_interfaces(response):
+    """
+    Normalise an OpenConfig gNMI Get reply into Interface records.
+    
+    Args:
+        response: gNMI Get reply as returned by pygnmi
+    
+    Returns:
+        List of Interface records
+    """
+    return parse_openconfig_interfaces(response)
+
+
+def retrieve_fleet_interfaces(targets, workers, timeout):
+    """
+    Retrieve the interfaces of every inventory device concurrently.
+    
+    Args:
+        targets: GnmiTarget list loaded from the inventory
+        workers: Maximum number of devices queried at the same time
+        timeout: Per-device deadline in seconds
+    
+    Returns:
+        True if every device answered
+    """
+    print("\n" + "="*60)
+    print(f"📋 RETRIEVING INTERFACES FROM {len(targets)} DEVICES")
+    print("="*60 + "\n")
+    
+    started = time.monotonic()
+    interfaces = []
+    failed = 0
+    
+    # Results arrive as soon as each device answers
+    for result in collect_interfaces(targets, workers=workers, timeout=timeout):
+        target = result.target
+        if result.ok:
+            interfaces.extend(result.interfaces)
+            print(f"✅ {target.name} ({target.host}:{target.port}): {len(result.interfaces)} interfaces in {result.elapsed:.2f}s")
+        else:
+            failed += 1
+            print(f"❌ {target.name} ({target.host}:{target.port}): {result.error}")
+    
+    if interfaces:
+        print(f"\n{'Device':<20} {'Interface':<30} {'IP Address':<20} {'Status':<12} {'Description'}")
+        print("═" * 120)
+        for interface in sorted(interfaces, key=lambda i: (i.device, i.name)):
+            status = '✓ up' if interface.admin_status == 'UP' else '✗ down'
+            print(f"{interface.device:<20} {interface.name:<30} {interface.ip_address:<20} {status:<12} {interface.description}")
+        print("─" * 120)
+    
+    print(f"\n📊 Total interfaces: {len(interfaces)} from {len(targets) - failed}/{len(targets)} devices "
+          f"in {time.monotonic() - started:.2f}s\n")
+    return failed == 0
+
+
+def stream_interfaces(targets, mode='on_change', sample_interval=DEFAULT_SAMPLE_INTERVAL,
+                      sync_timeout=30, export=None):
+    """
+    Subscribe to the interface state of devices and print changes as they stream in.
+    
+    The initial state is printed once every device has synced, then one line
+    per changed interface until Ctrl+C.
+    
+    Args:
+        targets: GnmiTarget list
+        mode: Subscription mode ('on_change' or 'sample')
+        sample_interval: Seconds between samples in 'sample' mode
+        sync_timeout: Seconds to wait for the initial state of every device
+        export: File to write the final state table to (format from its suffix)
+    """
+    print("\n" + "="*60)
+    print(f"📡 STREAMING INTERFACE STATE ({mode.upper()})")
+    print("="*60 + "\n")
+    
+    synced = False
+    
+    def on_change(device, name, interface):
+        if not synced:
+            return
+        if interface is None:
+            print(f"➖ {device} {name}: removed")
+        else:
+            status = '✓ up' if interface.admin_status == 'UP' else '✗ down'
+            print(f"🔄 {device} {name}: {status} oper={interface.oper_status} {interface.ip_address} {interface.description}")
+    
+    collector = TelemetryCollector(targets, mode=mode, sample_interval=sample_interval)
+    collector.table.on_change = on_change
+    
+    with collector:
+        if not collector.wait_for_sync(sync_timeout):
+            print(f"⚠️  Not every device sent its initial state within {sync_timeout}s\n")
+        synced = True
+        
+        print(f"{'Device':<20} {'Interface':<30} {'IP Address':<20} {'Status':<12} {'Description'}")
+        print("═" * 120)
+        for interface in collector.table.interfaces():
+            status = '✓ up' if interface.admin_status == 'UP' else '✗ down'
+            print(f"{interface.device:<20} {interface.name:<30} {interface.ip_address:<20} {status:<12} {interface.description}")
+        print("─" * 120)
+        print("\n👀 Watching for changes (Ctrl+C to stop)...\n")
+        
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\n⏹  Subscription stopped.")
+    
+    if export:
+        output_format = Path(export).suffix.lstrip('.')
+        with open_writer(output_format, export) as writer:
+            writer.write_all(collector.table.interfaces())
+        print(f"💾 Exported {writer.count} interfaces to {export}")
+
+
 def configure_interface(connection, interface_name, ip_address, prefix_length, description=''):
     """
     Configure an interface using OpenConfig models.
@@ -235,7 +327,8 @@ def display_menu():
     print("="*60)
     print("1. 📋 Retrieve Interface Information")
     print("2. ⚙️  Configure Interface")
-    print("3. 🚪 Exit")
+    print("3. 📡 Stream Interface State")
+    print("4. 🚪 Exit")
     print("="*60)
 
 
@@ -248,20 +341,61 @@ def main():
 Examples:
   %(prog)s --host 192.168.1.1 --username admin --password secret
   %(prog)s -H 10.0.0.1 -u admin -p pass123 -P 830
+  %(prog)s --inventory ../02-ansible/inventory.yml
+  %(prog)s --inventory testbed.yaml --workers 32 --timeout 5    (devices with a gnmi connection)
+  %(prog)s --inventory ../02-ansible/inventory.yml --stream --export interfaces.csv
         """
     )
     
-    parser.add_argument('-H', '--host', required=True,
+    parser.add_argument('-H', '--host',
                         help='Device IP address or hostname')
-    parser.add_argument('-u', '--username', required=True,
-                        help='gNMI username')
-    parser.add_argument('-p', '--password', required=True,
-                        help='gNMI password')
+    parser.add_argument('-u', '--username',
+                        help='gNMI username (overrides the inventory credentials)')
+    parser.add_argument('-p', '--password',
+                        help='gNMI password (overrides the inventory credentials)')
     parser.add_argument('-P', '--port', type=int, default=57400,
                         help='gNMI port (default: 57400)')
+    parser.add_argument('-i', '--inventory',
+                        help='Ansible inventory.yml or pyATS testbed.yaml: retrieve the interfaces '
+                             'of every device concurrently instead of opening the menu')
+    parser.add_argument('-g', '--group',
+                        help='Only query the hosts of this Ansible inventory group')
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Devices queried concurrently with --inventory (default: {DEFAULT_WORKERS})')
+    parser.add_argument('-t', '--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Per-device deadline in seconds with --inventory (default: {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help='With --inventory: subscribe to interface state (gNMI Subscribe) '
+                             'and print changes as they happen instead of a single Get')
+    parser.add_argument('-m', '--mode', choices=SUBSCRIPTION_MODES, default='on_change',
+                        help='Subscription mode of the streaming state table (default: on_change)')
+    parser.add_argument('--sample-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL,
+                        help=f'Seconds between samples in sample mode (default: {DEFAULT_SAMPLE_INTERVAL:g})')
+    parser.add_argument('-e', '--export',
+                        help=f'Write the streamed state table to this file when stopping '
+                             f'(format from the suffix: {", ".join(EXPORT_FORMATS)})')
     
     args = parser.parse_args()
     
+    if args.export and Path(args.export).suffix.lstrip('.') not in EXPORT_FORMATS:
+        parser.error(f'--export must end in one of: {", ".join("." + f for f in EXPORT_FORMATS)}')
+    
+    if args.inventory:
+        targets = load_targets(args.inventory, group=args.group, port=args.port)
+        if not targets:
+            print(f"❌ ERROR: No devices found in {args.inventory}")
+            sys.exit(1)
+        for target in targets:
+            target.username = args.username or target.username
+            target.password = args.password or target.password
+        if args.stream:
+            stream_interfaces(targets, args.mode, args.sample_interval, export=args.export)
+            sys.exit(0)
+        sys.exit(0 if retrieve_fleet_interfaces(targets, args.workers, args.timeout) else 1)
+    
+    if not (args.host and args.username and args.password):
+        parser.error('--host, --username and --password are required without --inventory')
+    
     # Connect to device
     print(f"\n🔌 Connecting to {args.host}...")
     connection = create_device_connection(
@@ -280,7 +414,7 @@ Examples:
     try:
         while True:
             display_menu()
-            choice = input("\nEnter your choice (1-3): ").strip()
+            choice = input("\nEnter your choice (1-4): ").strip()
             
             if choice == '1':
                 retrieve_interfaces(connection)
@@ -302,11 +436,15 @@ Examples:
                 )
                 
             elif choice == '3':
+                target = GnmiTarget(args.host, args.host, args.port, args.username, args.password)
+                stream_interfaces([target], args.mode, args.sample_interval, export=args.export)
+                
+            elif choice == '4':
                 print("\n👋 Exiting... Goodbye!")
                 break
                 
             else:
-                print("\n⚠️  Invalid choice. Please select 1, 2, or 3.")
+                print("\n⚠️  Invalid choice. Please select 1, 2, 3, or 4.")
             
             input("\nPress Enter to continue...")
     
@@ -51,6 +51,23 @@ options:
     required: false
     type: bool
     default: true
+  persistent:
+    description:
+      - Reuse one gNMI channel per target across tasks
+      - The first task forks a local session daemon that keeps the gRPC channel
+        open; later tasks for the same host, port and credentials send their
+        RPCs through it instead of connecting again
+      - The daemon keeps the credentials in memory until it has been idle for
+        I(persistent_idle_timeout) seconds
+    required: false
+    type: bool
+    default: false
+  persistent_idle_timeout:
+    description:
+      - Seconds the persistent channel stays open without requests
+    required: false
+    type: int
+    default: 60
 '''
 
 EXAMPLES = r'''
@@ -93,12 +110,7 @@ response:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-
-try:
-    from pygnmi.client import gNMIclient
-    HAS_PYGNMI = True
-except ImportError:
-    HAS_PYGNMI = False
+from ansible.module_utils.gnmi_session import HAS_PYGNMI, open_gnmi
 
 
 def run_module():
@@ -109,6 +121,8 @@ def run_module():
         password=dict(type='str', required=True, no_log=True),
         path=dict(type='raw', required=True),
         insecure=dict(type='bool', required=False, default=True),
+        persistent=dict(type='bool', required=False, default=False),
+        persistent_idle_timeout=dict(type='int', required=False, default=60),
     )
 
     result = dict(
@@ -131,25 +145,21 @@ def run_module():
     password = module.params['password']
     path = module.params['path']
     insecure = module.params['insecure']
+    persistent = module.params['persistent']
+    idle_timeout = module.params['persistent_idle_timeout']
 
     # Ensure path is a list
     if isinstance(path, str):
         path = [path]
 
     try:
-        # Create gNMI connection
-        connection = gNMIclient(
-            target=(host, port),
-            username=username,
-            password=password,
-            insecure=insecure
-        )
-        connection.connect()
+        # Create (or reuse) the gNMI connection
+        connection = open_gnmi(host, port, username, password, insecure, persistent, idle_timeout)
 
         # Execute gNMI Get
         response = connection.get(path=path, encoding='json_ietf')
         
-        # Close connection
+        # Close connection (a persistent channel stays open for the next task)
         connection.close()
 
         result['response'] = response
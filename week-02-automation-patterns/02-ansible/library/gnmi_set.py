@@ -7,6 +7,8 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import re
+
 DOCUMENTATION = r'''
 ---
 module: gnmi_set
@@ -15,6 +17,8 @@ version_added: "1.0.0"
 description:
   - Configure network devices using gNMI Set operations
   - Supports OpenConfig models natively via pygnmi
+  - All updates, replaces and deletes of a task are sent in one SetRequest,
+    which the device applies atomically in a single commit
 author:
   - Network Automation Team
 options:
@@ -58,12 +62,46 @@ options:
     required: false
     type: list
     elements: str
+  interfaces:
+    description:
+      - Interfaces to configure, in the host_vars format (name, description,
+        enabled, mtu, ipv4_address, ipv4_prefix_length)
+      - Each interface becomes one OpenConfig entry of the same SetRequest,
+        with its type derived from its name; use this instead of looping
+        over the module once per interface
+    required: false
+    type: list
+    elements: dict
+  interface_operation:
+    description:
+      - Set operation used for the entries built from I(interfaces)
+    required: false
+    type: str
+    choices: [update, replace]
+    default: update
   insecure:
     description:
       - Skip TLS certificate validation
     required: false
     type: bool
     default: true
+  persistent:
+    description:
+      - Reuse one gNMI channel per target across tasks
+      - The first task forks a local session daemon that keeps the gRPC channel
+        open; later tasks for the same host, port and credentials send their
+        RPCs through it instead of connecting again
+      - The daemon keeps the credentials in memory until it has been idle for
+        I(persistent_idle_timeout) seconds
+    required: false
+    type: bool
+    default: false
+  persistent_idle_timeout:
+    description:
+      - Seconds the persistent channel stays open without requests
+    required: false
+    type: int
+    default: 60
 '''
 
 EXAMPLES = r'''
@@ -83,6 +121,15 @@ EXAMPLES = r'''
             description: "Configured by Ansible"
             enabled: true
 
+# Configure all interfaces of a host in one SetRequest (one device commit)
+- name: Configure interfaces
+  gnmi_set:
+    host: "{{ ansible_host }}"
+    port: 57400
+    username: admin
+    password: secret
+    interfaces: "{{ interfaces }}"
+
 # Delete configuration
 - name: Delete interface description
   gnmi_set:
@@ -95,6 +142,11 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
+operations:
+  description: Number of update, replace and delete operations sent in the SetRequest
+  returned: success
+  type: dict
+  sample: {"update": 12, "replace": 0, "delete": 0}
 response:
   description: The gNMI Set response
   returned: always
@@ -102,12 +154,70 @@ response:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.gnmi_session import HAS_PYGNMI, open_gnmi
+
+
+OC_INTERFACE_PATH = 'openconfig-interfaces:interfaces/interface'
+
+
+def interface_type(name):
+    """Derive the IANA interface type from an interface name"""
+    name = name.lower()
+    if 'loopback' in name:
+        return 'iana-if-type:softwareLoopback'
+    if 'tunnel' in name:
+        return 'iana-if-type:tunnel'
+    if 'vlan' in name:
+        return 'iana-if-type:l3ipvlan'
+    if 'bundle' in name or 'port-channel' in name:
+        return 'iana-if-type:ieee8023adLag'
+    if re.search(r'gigabit|ethernet|eth|ge|te|fortygige|hundredgige', name):
+        return 'iana-if-type:ethernetCsmacd'
+    return 'iana-if-type:other'
+
 
-try:
-    from pygnmi.client import gNMIclient
-    HAS_PYGNMI = True
-except ImportError:
-    HAS_PYGNMI = False
+def interface_entry(interface):
+    """
+    Build the OpenConfig (path, value) entry of one interface
+
+    Args:
+        interface: Dict with name and optional description, enabled, mtu,
+                   ipv4_address and ipv4_prefix_length
+
+    Returns:
+        Dict with the path and value of a gNMI update/replace
+    """
+    name = interface['name']
+    config = {
+        'name': name,
+        'type': interface_type(name),
+        'description': interface.get('description', 'Configured by Ansible'),
+        'enabled': interface.get('enabled', True)
+    }
+    if 'loopback' not in name.lower():
+        config['mtu'] = int(interface.get('mtu', 1500))
+
+    value = {'name': name, 'config': config}
+    if interface.get('ipv4_address'):
+        address = interface['ipv4_address']
+        value['subinterfaces'] = {
+            'subinterface': [{
+                'index': 0,
+                'openconfig-if-ip:ipv4': {
+                    'addresses': {
+                        'address': [{
+                            'ip': address,
+                            'config': {
+                                'ip': address,
+                                'prefix-length': int(interface.get('ipv4_prefix_length', 32))
+                            }
+                        }]
+                    }
+                }
+            }]
+        }
+
+    return {'path': OC_INTERFACE_PATH, 'value': value}
 
 
 def run_module():
@@ -119,7 +229,11 @@ def run_module():
         update=dict(type='list', elements='dict', required=False, default=[]),
         replace=dict(type='list', elements='dict', required=False, default=[]),
         delete=dict(type='list', elements='str', required=False, default=[]),
+        interfaces=dict(type='list', elements='dict', required=False, default=[]),
+        interface_operation=dict(type='str', required=False, default='update', choices=['update', 'replace']),
         insecure=dict(type='bool', required=False, default=True),
+        persistent=dict(type='bool', required=False, default=False),
+        persistent_idle_timeout=dict(type='int', required=False, default=60),
     )
 
     result = dict(
@@ -140,33 +254,41 @@ def run_module():
     port = module.params['port']
     username = module.params['username']
     password = module.params['password']
-    update_list = module.params['update']
-    replace_list = module.params['replace']
-    delete_list = module.params['delete']
+    update_list = list(module.params['update'])
+    replace_list = list(module.params['replace'])
+    delete_list = list(module.params['delete'])
     insecure = module.params['insecure']
+    persistent = module.params['persistent']
+    idle_timeout = module.params['persistent_idle_timeout']
+
+    # Interfaces join the same SetRequest as the explicit update/replace entries
+    try:
+        interface_entries = [interface_entry(interface) for interface in module.params['interfaces']]
+    except (KeyError, TypeError, ValueError) as e:
+        module.fail_json(msg=f'Invalid interface definition: {str(e)}')
+    if module.params['interface_operation'] == 'replace':
+        replace_list += interface_entries
+    else:
+        update_list += interface_entries
 
     # Check if at least one operation is specified
     if not (update_list or replace_list or delete_list):
-        module.fail_json(msg='At least one of update, replace, or delete must be specified')
+        module.fail_json(msg='At least one of update, replace, delete, or interfaces must be specified')
+
+    result['operations'] = dict(update=len(update_list), replace=len(replace_list), delete=len(delete_list))
 
     if module.check_mode:
         module.exit_json(**result)
 
     try:
-        # Create gNMI connection
-        connection = gNMIclient(
-            target=(host, port),
-            username=username,
-            password=password,
-            insecure=insecure
-        )
-        connection.connect()
+        # Create (or reuse) the gNMI connection
+        connection = open_gnmi(host, port, username, password, insecure, persistent, idle_timeout)
 
         # Convert update/replace dicts to tuples for pygnmi
         update_tuples = [(item['path'], item['value']) for item in update_list] if update_list else None
         replace_tuples = [(item['path'], item['value']) for item in replace_list] if replace_list else None
 
-        # Execute gNMI Set
+        # Execute gNMI Set: a single SetRequest for every operation
         response = connection.set(
             update=update_tuples,
             replace=replace_tuples,
@@ -174,7 +296,7 @@ def run_module():
             encoding='json_ietf'
         )
         
-        # Close connection
+        # Close connection (a persistent channel stays open for the next task)
         connection.close()
 
         result['response'] = response
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Network Automation
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Persistent gNMI sessions for the gnmi_get / gnmi_set modules.
+
+Ansible runs every task in a new process, so a gNMIclient never outlives the
+module that opened it and each task pays a full gRPC/TLS channel setup. With
+a persistent session, the first module that reaches a target forks a small
+session daemon which owns the gRPC channel and listens on a per-target Unix
+socket (one per host, port and credentials, under ~/.ansible/gnmi). Later
+tasks for the same target send their RPCs to the daemon and reuse the open
+channel. The daemon exits after idle_timeout seconds without requests, i.e.
+shortly after the play is done with the target. Sessions are opt-in (the
+modules' persistent option): the daemon holds the target's credentials for
+its whole lifetime.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import time
+
+try:
+    from pygnmi.client import gNMIclient
+    HAS_PYGNMI = True
+except ImportError:
+    HAS_PYGNMI = False
+
+
+SOCKET_DIR = os.path.join(os.path.expanduser('~'), '.ansible', 'gnmi')
+DEFAULT_IDLE_TIMEOUT = 60
+STARTUP_TIMEOUT = 10
+RPC_TIMEOUT = 300
+
+
+class GnmiSessionError(Exception):
+    """A gNMI RPC sent through a session daemon failed"""
+
+
+class GnmiSession:
+    """gNMIclient look-alike whose RPCs run in the target's session daemon"""
+
+    def __init__(self, host, port, username, password, insecure=True, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            host: IP address or hostname of the target device
+            port: gNMI port number
+            username: Username for authentication
+            password: Password for authentication
+            insecure: Skip TLS certificate validation
+            idle_timeout: Seconds the daemon keeps the channel open without requests
+        """
+        self.target = dict(host=host, port=port, username=username, password=password, insecure=insecure)
+        self.idle_timeout = idle_timeout
+        key = '|'.join(str(value) for value in (host, port, username, password, insecure))
+        self.socket_path = os.path.join(SOCKET_DIR, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + '.sock')
+
+    def get(self, **kwargs):
+        return self._call('get', kwargs)
+
+    def set(self, **kwargs):
+        return self._call('set', kwargs)
+
+    def close(self):
+        """Leave the channel open in the daemon for the next task"""
+
+    def shutdown(self):
+        """Close the channel and stop the daemon now"""
+        try:
+            _send(self.socket_path, {'op': 'shutdown'}, STARTUP_TIMEOUT)
+        except (OSError, ValueError):
+            pass
+
+    def _call(self, op, kwargs):
+        request = {'op': op, 'kwargs': kwargs}
+        try:
+            reply = _send(self.socket_path, request, RPC_TIMEOUT)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # No daemon yet, or a stale socket left by one that died
+            self._spawn()
+            try:
+                reply = _send(self.socket_path, request, RPC_TIMEOUT)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise GnmiSessionError('gNMI session daemon is not reachable: %s' % e)
+
+        if not reply.get('ok'):
+            raise GnmiSessionError(reply.get('error', 'unknown error'))
+        return reply.get('result')
+
+    def _spawn(self):
+        """
+        Start the session daemon of this target (double fork) and wait until it answers
+
+        Spawning is serialised per target with a lock file: with forks > 1,
+        the first tasks of the same target would otherwise each remove the
+        other's socket and start their own daemon.
+        """
+        os.makedirs(SOCKET_DIR, mode=0o700, exist_ok=True)
+        lock_fd = os.open(self.socket_path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            if self._ping():
+                # Started by another task while this one waited for the lock
+                return
+
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+            pid = os.fork()
+            if pid == 0:
+                # Intermediate child: detach from the module process and exit
+                try:
+                    os.setsid()
+                    if os.fork() == 0:
+                        _daemonize()
+                        _serve(self.socket_path, self.target, self.idle_timeout)
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+
+            # The socket file appears at bind(), before listen(): wait for a reply
+            deadline = time.monotonic() + STARTUP_TIMEOUT
+            while not self._ping():
+                if time.monotonic() > deadline:
+                    raise GnmiSessionError('gNMI session daemon did not start')
+                time.sleep(0.05)
+        finally:
+            os.close(lock_fd)
+
+    def _ping(self):
+        """Return True if the daemon of this target accepts requests"""
+        try:
+            return bool(_send(self.socket_path, {'op': 'ping'}, STARTUP_TIMEOUT).get('ok'))
+        except (OSError, ValueError):
+            return False
+
+
+def open_gnmi(host, port, username, password, insecure=True, persistent=False,
+              idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Return a connected gNMI client for a target
+
+    Args:
+        persistent: Reuse the target's channel across tasks through its session
+                    daemon; otherwise open a dedicated gNMIclient
+
+    Returns:
+        GnmiSession or connected gNMIclient; both offer get(), set() and close()
+    """
+    if persistent and hasattr(os, 'fork'):
+        return GnmiSession(host, port, username, password, insecure, idle_timeout)
+
+    connection = gNMIclient(
+        target=(host, port),
+        username=username,
+        password=password,
+        insecure=insecure
+    )
+    connection.connect()
+    return connection
+
+
+def _send(path, request, timeout):
+    """Send one JSON request line to a daemon socket and return the JSON reply"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    with sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        return json.loads(_read_line(sock))
+
+
+def _read_line(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            break
+    return b''.join(chunks)
+
+
+def _daemonize():
+    """Release the module's stdio and inherited descriptors so Ansible is not kept waiting"""
+    os.chdir('/')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.closerange(3, 1024)
+
+
+def _serve(path, target, idle_timeout):
+    """Session daemon loop: one gNMI channel, one request at a time, exit when idle"""
+    old_umask = os.umask(0o077)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(8)
+    server.settimeout(idle_timeout)
+    connection = None
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+
+            with conn:
+                conn.settimeout(RPC_TIMEOUT)
+                try:
+                    request = json.loads(_read_line(conn))
+                except (OSError, ValueError):
+                    continue
+
+                if request.get('op') == 'shutdown':
+                    conn.sendall(b'{"ok": true}\n')
+                    break
+                if request.get('op') == 'ping':
+                    conn.sendall(b'{"ok": true}\n')
+                    continue
+
+                try:
+                    if connection is None:
+                        connection = gNMIclient(
+                            target=(target['host'], target['port']),
+                            username=target['username'],
+                            password=target['password'],
+                            insecure=target['insecure']
+                        )
+                        connection.connect()
+                    reply = {'ok': True, 'result': _rpc(connection, request)}
+                except Exception as e:
+                    # Drop the channel, the next request reconnects
+                    reply = {'ok': False, 'error': str(e)}
+                    if connection is not None:
+                        _close_quietly(connection)
+                        connection = None
+
+                try:
+                    conn.sendall(json.dumps(reply, default=str).encode('utf-8') + b'\n')
+                except OSError:
+                    pass
+    finally:
+        if connection is not None:
+            _close_quietly(connection)
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _rpc(connection, request):
+    kwargs = request.get('kwargs', {})
+    if request.get('op') == 'get':
+        return connection.get(**kwargs)
+    if request.get('op') == 'set':
+        # JSON turned the (path, value) tuples into lists
+        for key in ('update', 'replace'):
+            if kwargs.get(key):
+                kwargs[key] = [tuple(item) for item in kwargs[key]]
+        return connection.set(**kwargs)
+    raise ValueError('Unsupported gNMI session operation: %s' % request.get('op'))
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
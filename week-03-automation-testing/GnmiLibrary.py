@@ -4,17 +4,77 @@ Provides keywords for connecting to network devices and retrieving interface inf
 """
 
 import json
-from pygnmi.client import gNMIclient
+import sys
+import time
+from pathlib import Path
 from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+
+# Shared interface record, gNMI sessions and streaming state table (common/ at the repository root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+from expected_state import open_store  # noqa: E402
+from gnmi_collector import (  # noqa: E402
+    DEFAULT_PORT, DEFAULT_WORKERS, GnmiTarget, load_targets, parse_openconfig_interface, parse_openconfig_interfaces
+)
+from gnmi_metrics import GnmiMetrics, write_metrics  # noqa: E402
+from gnmi_sessions import shared_manager  # noqa: E402
+from gnmi_telemetry import DEFAULT_SAMPLE_INTERVAL, InterfaceStateTable, TelemetryCollector  # noqa: E402
+from interface_model import Interface  # noqa: E402
+
+
+INTERFACES_PATH = '/interfaces'
+
+# Characters of a gNMI reply shown in the log and interfaces listed one by one
+LOG_PREVIEW_CHARS = 500
+LOG_MAX_INTERFACES = 20
+
+# Interface fields checked against the expected state (when the expected value is not empty)
+COMPARED_FIELDS = ('description', 'admin_status', 'oper_status')
+
+# Metrics of every GnmiLibrary instance (suite) of this process, written together
+_RECORDERS = []
+
+
+def _preview(data, limit=LOG_PREVIEW_CHARS):
+    """Return the beginning of the JSON form of data, serialising only that much of it"""
+    chunks = []
+    size = 0
+    for chunk in json.JSONEncoder(default=str).iterencode(data):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return ''.join(chunks)[:limit] + '...'
+    return ''.join(chunks)
 
 
 class GnmiLibrary:
     """Robot Framework library for gNMI operations using pygnmi"""
     
     ROBOT_LIBRARY_SCOPE = 'SUITE'
+    ROBOT_LISTENER_API_VERSION = 3
     
-    def __init__(self):
+    def __init__(self, metrics_file=None, payload_metrics=False):
+        """
+        Args:
+            metrics_file: Write the timing metrics of the suites to this file when
+                          a suite ends (.prom / .txt: Prometheus text, otherwise JSON);
+                          under pabot, each process writes name.<queue index>.ext
+            payload_metrics: Measure the size of the gNMI replies (serialises each reply
+                             once more, so it is off by default)
+        """
+        self.ROBOT_LIBRARY_LISTENER = self
+        self.metrics = GnmiMetrics()
+        self.metrics_file = metrics_file or None
+        self.payload_metrics = payload_metrics
+        # Channels live in the process-wide session manager, shared with the
+        # other suites of this process; self.devices holds the ones in use here
+        self.sessions = shared_manager()
         self.devices = {}
+        self.fleet_errors = {}
+        self.targets = {}
+        self.telemetry = {}
+        self.state_table = InterfaceStateTable()
+        self.interface_cache = {}
     
     def connect_to_device_inline(self, device_name, host, port, username, password, insecure=True):
         """
@@ -29,25 +89,75 @@ class GnmiLibrary:
             insecure: Skip TLS verification (default: True)
         """
         logger.info(f"Connecting to device: {device_name} at {host}:{port}")
+        if device_name in self.devices:
+            logger.info(f"Already connected to {device_name}")
+            return True
         
         try:
-            # Convert port to integer
-            port = int(port)
-            
-            connection = gNMIclient(
-                target=(host, port),
-                username=username,
-                password=password,
-                insecure=insecure,
-                skip_verify=insecure
-            )
-            connection.connect()
-            self.devices[device_name] = connection
+            target = GnmiTarget(device_name, host, int(port), username, password, insecure)
+            self.devices[device_name] = self.sessions.connect(target, self.metrics)
+            self.targets[device_name] = target
             logger.info(f"Successfully connected to {device_name}")
             return True
         except Exception as e:
             raise Exception(f"Failed to connect to {device_name}: {str(e)}")
     
+    def connect_to_fleet(self, expected_file, inventory=None, port=DEFAULT_PORT, username='', password='',
+                         insecure=True, devices=None, workers=DEFAULT_WORKERS):
+        """
+        Connect concurrently to every device of an expected interfaces file
+        
+        Addresses and credentials come from an Ansible inventory.yml or a
+        pyATS testbed.yaml when given; otherwise each device name is used as
+        its hostname, with port, username and password. Devices that cannot
+        be reached are reported by 'Audit Fleet Interfaces'.
+        
+        Args:
+            expected_file: expected_interfaces.json, a shard directory or a database
+                           (see 'Load Expected Interfaces')
+            inventory: Ansible inventory or pyATS testbed with the device addresses
+            port: gNMI port of devices without one in the inventory
+            username: Authentication username (overrides the inventory)
+            password: Authentication password (overrides the inventory)
+            insecure: Skip TLS verification (default: True)
+            devices: Only these devices (list or comma-separated), e.g. the
+                     share of one pabot process
+            workers: Maximum number of devices connected at the same time
+            
+        Returns:
+            Names of the connected devices
+        """
+        names = [name for name in open_store(expected_file).devices() if name not in self.devices]
+        wanted = self._device_list(devices)
+        if wanted is not None:
+            names = [name for name in names if name in wanted]
+        
+        known = {target.name: target for target in load_targets(inventory, port=int(port))} if inventory else {}
+        targets = []
+        for name in names:
+            target = known.get(name)
+            if inventory and target is None:
+                self.fleet_errors[name] = f"not found in {inventory}"
+                continue
+            target = target or GnmiTarget(name, name, int(port))
+            target.username = username or target.username
+            target.password = password or target.password
+            target.insecure = insecure
+            targets.append(target)
+        
+        logger.info(f"Connecting to {len(targets)} devices ({workers} at a time)")
+        for name, error in self.sessions.connect_all(targets, int(workers), self.metrics).items():
+            if error is None:
+                self.devices[name] = self.sessions.connection(name)
+                self.fleet_errors.pop(name, None)
+            else:
+                self.fleet_errors[name] = f"connection failed: {error}"
+                logger.warn(f"Failed to connect to {name}: {error}")
+        self.targets.update({target.name: target for target in targets if target.name in self.devices})
+        
+        logger.info(f"✓ Connected to {len(self.devices)} devices, {len(self.fleet_errors)} unreachable")
+        return list(self.devices)
+    
     def get_interfaces_via_gnmi(self, device_name):
         """
         Retrieve interface configuration from device using gNMI and OpenConfig
@@ -61,12 +171,11 @@ class GnmiLibrary:
         if device_name not in self.devices:
             raise Exception(f"Device {device_name} not connected. Call 'Connect To Device' first.")
         
-        connection = self.devices[device_name]
         logger.info(f"Retrieving interface configuration from {device_name}")
         
         try:
             path = '/interfaces'
-            response = connection.get(path=[path], encoding='json_ietf')
+            response = self.sessions.call(device_name, 'get', self.metrics, path=[path], encoding='json_ietf')
             
             # Parse response
             interfaces_data = {}
@@ -78,7 +187,8 @@ class GnmiLibrary:
                                 interfaces_data = update['val']
                                 if interfaces_data:
                                     logger.info(f"✓ Successfully retrieved interfaces from {device_name}")
-                                    logger.info(f"Response data: {json.dumps(interfaces_data, indent=2)[:500]}...")
+                                    logger.info(f"Response data: {_preview(interfaces_data)}")
+                                    self._record_payload(device_name, response)
                                     return json.dumps(interfaces_data)
             
             raise Exception(f"No interface data received from {device_name}")
@@ -87,6 +197,178 @@ class GnmiLibrary:
             logger.error(error_msg)
             raise Exception(error_msg)
     
+    def get_interfaces(self, device_name, refresh=False):
+        """
+        Return the normalised interfaces of a device
+        
+        The gNMI reply is parsed straight into Interface records (no JSON
+        string round trip) and memoised for the rest of the suite; use
+        'Refresh Interfaces' or refresh=${True} to query the device again.
+        
+        Args:
+            device_name: Name of the device
+            refresh: Ignore the memoised records and query the device
+            
+        Returns:
+            List of Interface records (item access such as ${interface}[name] is supported)
+        """
+        if not refresh and device_name in self.interface_cache:
+            logger.info(f"Using the {len(self.interface_cache[device_name])} interfaces already retrieved from {device_name}")
+            return self.interface_cache[device_name]
+        
+        if device_name not in self.devices:
+            raise Exception(f"Device {device_name} not connected. Call 'Connect To Device' first.")
+        
+        logger.info(f"Retrieving interfaces from {device_name}")
+        try:
+            response = self.sessions.call(device_name, 'get', self.metrics, path=[INTERFACES_PATH], encoding='json_ietf')
+        except Exception as e:
+            error_msg = f"Failed to get interfaces from {device_name}: {str(e)}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+        
+        self._record_payload(device_name, response)
+        with self.metrics.timer(device_name, 'parse'):
+            interfaces = parse_openconfig_interfaces(response, device=device_name, config_first=True)
+        if not interfaces:
+            logger.info(f"Response data: {_preview(response)}")
+            raise Exception(f"No interface data received from {device_name}")
+        
+        self.interface_cache[device_name] = interfaces
+        self._log_interfaces(interfaces)
+        logger.info(f"✓ Retrieved {len(interfaces)} interfaces from {device_name}")
+        return interfaces
+    
+    def get_fleet_interfaces(self, devices=None, refresh=False, workers=DEFAULT_WORKERS):
+        """
+        Retrieve the interfaces of many connected devices in parallel
+        
+        Devices whose interfaces are already memoised are not queried again
+        unless refresh is true; failures are kept for 'Audit Fleet Interfaces'.
+        
+        Args:
+            devices: Devices to query (list or comma-separated, default: all connected)
+            refresh: Query devices with memoised interfaces as well
+            workers: Maximum number of Gets running at the same time
+            
+        Returns:
+            Dictionary of device name -> list of Interface records
+        """
+        names = self._device_list(devices)
+        names = [name for name in (names if names is not None else self.devices) if name in self.devices]
+        pending = [name for name in names if refresh or name not in self.interface_cache]
+        
+        logger.info(f"Retrieving interfaces from {len(pending)} devices ({workers} at a time)")
+        for name, response, error in self.sessions.get_many(pending, INTERFACES_PATH, workers=int(workers),
+                                                            metrics=self.metrics):
+            interfaces = []
+            if error is None:
+                self._record_payload(name, response)
+                with self.metrics.timer(name, 'parse'):
+                    interfaces = parse_openconfig_interfaces(response, device=name, config_first=True)
+            if error is None and not interfaces:
+                error = 'no interface data received'
+            if error is not None:
+                self.fleet_errors[name] = f"Get failed: {error}"
+                logger.warn(f"Failed to get interfaces from {name}: {error}")
+                continue
+            self.fleet_errors.pop(name, None)
+            self.interface_cache[name] = interfaces
+            logger.info(f"✓ Retrieved {len(interfaces)} interfaces from {name}")
+        
+        return {name: self.interface_cache[name] for name in names if name in self.interface_cache}
+    
+    def audit_fleet_interfaces(self, expected_file, devices=None, fail_on_extra=False, workers=DEFAULT_WORKERS):
+        """
+        Audit every connected device against an expected interfaces file
+        
+        Interfaces are retrieved in parallel ('Get Fleet Interfaces'), then
+        each device is compared with its expected state. The keyword fails
+        once, listing every unreachable device and every difference.
+        
+        Args:
+            expected_file: expected_interfaces.json, a shard directory or a database
+            devices: Devices to audit (list or comma-separated, default: all
+                     connected or unreachable devices)
+            fail_on_extra: Also fail on interfaces that are not expected
+            workers: Maximum number of Gets running at the same time
+            
+        Returns:
+            Dictionary of device name -> comparison result (see 'Compare
+            Interfaces Against Expected') or error message
+        """
+        fleet = self.get_fleet_interfaces(devices, workers=workers)
+        store = open_store(expected_file)
+        
+        wanted = self._device_list(devices)
+        names = sorted(set(fleet) | set(self.fleet_errors))
+        if wanted is not None:
+            names = [name for name in names if name in wanted]
+        
+        results = {}
+        problems = []
+        for name in names:
+            if name not in fleet:
+                results[name] = self.fleet_errors.get(name, 'not connected')
+                problems.append(f"{name}: {results[name]}")
+                continue
+            expected = store.get(name)
+            if expected is None:
+                results[name] = 'not in expected interfaces file'
+                problems.append(f"{name}: {results[name]}")
+                continue
+            result = self.compare_interfaces_against_expected(fleet[name], expected, name,
+                                                              fail_on_differences=False)
+            results[name] = result
+            failed = len(result['missing']) + len(result['mismatched']) + (len(result['extra']) if fail_on_extra else 0)
+            if failed:
+                problems.append(f"{name}: {len(result['missing'])} missing, {len(result['mismatched'])} mismatched"
+                                + (f", {len(result['extra'])} extra" if fail_on_extra else ''))
+        
+        logger.info(f"Audited {len(names)} devices: {len(problems)} failed")
+        if problems:
+            raise AssertionError(f"{len(problems)} of {len(names)} devices failed the interface audit:\n"
+                                 + '\n'.join(problems))
+        return results
+    
+    def _device_list(self, devices):
+        if devices is None or devices == '':
+            return None
+        if isinstance(devices, str):
+            return [name.strip() for name in devices.split(',') if name.strip()]
+        return list(devices)
+    
+    def refresh_interfaces(self, device_name):
+        """
+        Query a device again and replace its memoised interfaces
+        
+        Args:
+            device_name: Name of the device
+            
+        Returns:
+            List of Interface records
+        """
+        return self.get_interfaces(device_name, refresh=True)
+    
+    def clear_interface_cache(self, device_name=None):
+        """
+        Forget the memoised interfaces of a device, or of every device
+        
+        Args:
+            device_name: Name of the device (default: all devices)
+        """
+        if device_name is None:
+            self.interface_cache.clear()
+        else:
+            self.interface_cache.pop(device_name, None)
+    
+    def _log_interfaces(self, interfaces):
+        for interface in interfaces[:LOG_MAX_INTERFACES]:
+            logger.info(f"Parsed interface: {interface.name} - {interface.description} - "
+                        f"Admin: {interface.admin_status}, Oper: {interface.oper_status}")
+        if len(interfaces) > LOG_MAX_INTERFACES:
+            logger.info(f"... and {len(interfaces) - LOG_MAX_INTERFACES} more interfaces")
+    
     def parse_interfaces_from_json(self, json_string):
         """
         Extract interface details from JSON response
@@ -95,40 +377,19 @@ class GnmiLibrary:
             json_string: JSON string containing interface data
             
         Returns:
-            List of dictionaries with interface name, description, and status
+            List of Interface records with name, description, and status
+            (item access such as ${interface}[name] is supported)
         """
         try:
             data = json.loads(json_string)
-            interfaces = []
             
             # OpenConfig interfaces structure
             interface_list = data.get('openconfig-interfaces:interface', data.get('interface', []))
             
-            for intf in interface_list:
-                # Get interface name
-                name = intf.get('name', 'Unknown')
-                
-                # Get config and state
-                config = intf.get('config', {})
-                state = intf.get('state', {})
-                
-                # Get description
-                description = config.get('description', state.get('description', ''))
-                
-                # Get admin and operational status
-                admin_status = config.get('enabled', state.get('enabled', None))
-                oper_status = state.get('oper-status', 'UNKNOWN')
-                
-                interface_info = {
-                    'name': name,
-                    'description': description,
-                    'admin_status': 'UP' if admin_status else 'DOWN',
-                    'oper_status': oper_status
-                }
-                
-                interfaces.append(interface_info)
-                logger.info(f"Parsed interface: {name} - {description} - Admin: {interface_info['admin_status']}, Oper: {oper_status}")
+            # Same rules as Get Interfaces: config first, oper-status UNKNOWN when absent
+            interfaces = [parse_openconfig_interface(intf, config_first=True) for intf in interface_list]
             
+            self._log_interfaces(interfaces)
             logger.info(f"Total interfaces parsed: {len(interfaces)}")
             return interfaces
         except Exception as e:
@@ -138,27 +399,29 @@ class GnmiLibrary:
     
     def load_expected_interfaces(self, expected_file, device_name):
         """
-        Load expected interfaces for a device from JSON file
+        Load expected interfaces for a device
+        
+        The expected state is read once per process and parsed again only
+        when the file changes. expected_file can also be a directory of
+        per-device shards (<device>.json) or a SQLite database (.db), in
+        which case only the device's own section is read.
         
         Args:
-            expected_file: Path to expected_interfaces.json file
+            expected_file: Path to expected_interfaces.json, a shard directory or a database
             device_name: Name of the device
             
         Returns:
             List of expected interface dictionaries
         """
         try:
-            with open(expected_file, 'r') as f:
-                expected_data = json.load(f)
-            
-            if device_name not in expected_data:
-                raise Exception(f"Device {device_name} not found in expected interfaces file")
-            
-            expected_interfaces = expected_data[device_name]
-            logger.info(f"Expected interfaces for {device_name}: {len(expected_interfaces)} interfaces")
-            return expected_interfaces
+            expected_interfaces = open_store(expected_file).get(device_name)
         except Exception as e:
             raise Exception(f"Failed to load expected interfaces: {str(e)}")
+        
+        if expected_interfaces is None:
+            raise Exception(f"Failed to load expected interfaces: Device {device_name} not found in {expected_file}")
+        logger.info(f"Expected interfaces for {device_name}: {len(expected_interfaces)} interfaces")
+        return expected_interfaces
     
     def verify_interface_exists(self, interface_name, actual_interfaces):
         """
@@ -166,15 +429,210 @@ class GnmiLibrary:
         
         Args:
             interface_name: Name of the interface to find
-            actual_interfaces: List of actual interface dictionaries
+            actual_interfaces: List of actual Interface records or interface dictionaries
+            
+        Returns:
+            Interface record if found, None otherwise
+        """
+        return next((interface for interface in actual_interfaces if interface['name'] == interface_name), None)
+    
+    def compare_interfaces_against_expected(self, actual_interfaces, expected_interfaces, device_name='',
+                                            fail_on_differences=True, fail_on_extra=False):
+        """
+        Compare a device's interfaces with its expected state in a single pass
+        
+        Only the fields of COMPARED_FIELDS that have a non-empty expected value
+        are checked.
+        
+        Args:
+            actual_interfaces: List of actual Interface records or interface dictionaries
+            expected_interfaces: List of expected interface dictionaries
+            device_name: Device name used in the messages
+            fail_on_differences: Fail when interfaces are missing or mismatched
+            fail_on_extra: Also fail on interfaces that are not expected
             
         Returns:
-            Dictionary with interface details if found, None otherwise
+            Dictionary with 'missing' and 'extra' interface names and
+            'mismatched' entries (name, field, expected, actual)
         """
-        for intf in actual_interfaces:
-            if intf['name'] == interface_name:
-                return intf
-        return None
+        start = time.perf_counter()
+        # Robot passes a copy of the list, so the index is built per call (one pass)
+        index = {interface['name']: interface for interface in actual_interfaces}
+        expected_names = set()
+        missing = []
+        mismatched = []
+        
+        for expected in expected_interfaces:
+            name = expected['name']
+            expected_names.add(name)
+            actual = index.get(name)
+            if actual is None:
+                missing.append(name)
+                continue
+            for field in COMPARED_FIELDS:
+                value = expected.get(field, '')
+                if value != '' and actual.get(field) != value:
+                    mismatched.append({'name': name, 'field': field, 'expected': value, 'actual': actual.get(field)})
+        
+        extra = [name for name in index if name not in expected_names]
+        self.metrics.record(device_name or 'unknown', 'compare', time.perf_counter() - start)
+        result = {'missing': missing, 'extra': extra, 'mismatched': mismatched}
+        
+        device = f" on {device_name}" if device_name else ''
+        logger.info(f"Compared {len(expected_names)} expected with {len(index)} actual interfaces{device}: "
+                    f"{len(missing)} missing, {len(mismatched)} mismatched, {len(extra)} extra")
+        
+        problems = [f"Interface {name} not found{device}" for name in missing]
+        problems += [f"Interface {m['name']} {m['field']} mismatch{device}. Expected: {m['expected']}, Got: {m['actual']}"
+                     for m in mismatched]
+        if fail_on_extra:
+            problems += [f"Unexpected interface {name}{device}" for name in extra]
+        for problem in problems[:LOG_MAX_INTERFACES]:
+            logger.info(problem)
+        
+        if problems and (fail_on_differences or fail_on_extra):
+            more = f"\n... and {len(problems) - LOG_MAX_INTERFACES} more" if len(problems) > LOG_MAX_INTERFACES else ''
+            raise AssertionError('\n'.join(problems[:LOG_MAX_INTERFACES]) + more)
+        return result
+    
+    def start_interface_telemetry(self, device_name, mode='on_change',
+                                  sample_interval=DEFAULT_SAMPLE_INTERVAL, sync_timeout=30):
+        """
+        Subscribe to the interface state of a connected device (gNMI Subscribe)
+        
+        The device streams its interface state into an in-memory table that
+        later keywords read without polling the device again.
+        
+        Args:
+            device_name: Name of the device
+            mode: 'on_change' or 'sample'
+            sample_interval: Seconds between samples in 'sample' mode
+            sync_timeout: Seconds to wait for the initial state of the device
+        """
+        if device_name not in self.targets:
+            raise Exception(f"Device {device_name} not connected. Call 'Connect To Device' first.")
+        if device_name in self.telemetry:
+            return
+        
+        collector = TelemetryCollector([self.targets[device_name]], self.state_table, mode=mode,
+                                       sample_interval=float(sample_interval), log=logger.info)
+        self.telemetry[device_name] = collector.start()
+        if not collector.wait_for_sync(float(sync_timeout)):
+            self.stop_interface_telemetry(device_name)
+            raise Exception(f"No initial interface state from {device_name} within {sync_timeout}s")
+        logger.info(f"✓ Streaming interface state from {device_name} ({mode})")
+    
+    def get_interfaces_from_telemetry(self, device_name):
+        """
+        Return the current interfaces of a device from its streaming state table
+        
+        Args:
+            device_name: Name of the device (see 'Start Interface Telemetry')
+            
+        Returns:
+            List of Interface records
+        """
+        if device_name not in self.telemetry:
+            raise Exception(f"No telemetry for {device_name}. Call 'Start Interface Telemetry' first.")
+        interfaces = self.state_table.interfaces(device_name)
+        logger.info(f"Interfaces in the state table of {device_name}: {len(interfaces)}")
+        return interfaces
+    
+    def wait_until_interface_state(self, device_name, interface_name, field, expected, timeout=30):
+        """
+        Wait until a streamed interface field has the expected value
+        
+        Args:
+            device_name: Name of the device (see 'Start Interface Telemetry')
+            interface_name: Interface to watch
+            field: Interface field (e.g. oper_status, admin_status, description)
+            expected: Expected value
+            timeout: Seconds to wait
+            
+        Returns:
+            The Interface record once it matches
+        """
+        if device_name not in self.telemetry:
+            raise Exception(f"No telemetry for {device_name}. Call 'Start Interface Telemetry' first.")
+        
+        def matches(table):
+            interface = table.get(device_name, interface_name)
+            return interface is not None and str(interface.get(field)) == str(expected)
+        
+        if not self.state_table.wait_for(matches, float(timeout)):
+            actual = self.state_table.get(device_name, interface_name)
+            raise Exception(f"Interface {interface_name} on {device_name}: {field} is "
+                            f"{actual.get(field) if actual else 'missing'} after {timeout}s, expected {expected}")
+        return self.state_table.get(device_name, interface_name)
+    
+    def stop_interface_telemetry(self, device_name):
+        """
+        Cancel the interface state subscription of a device
+        
+        Args:
+            device_name: Name of the device
+        """
+        collector = self.telemetry.pop(device_name, None)
+        if collector is not None:
+            collector.stop()
+            logger.info(f"Stopped interface telemetry of {device_name}")
+    
+    def get_gnmi_metrics(self):
+        """
+        Return the timing metrics recorded in this suite
+        
+        Returns:
+            Dictionary with, per device, the count, total, max and last
+            duration of each phase (connect, get, parse, compare) and the
+            payload bytes received
+        """
+        return self.metrics.as_dict()
+    
+    def write_gnmi_metrics(self, path):
+        """
+        Write the timing metrics recorded in this suite to a file
+        
+        Args:
+            path: Output file (.prom / .txt: Prometheus text format, otherwise JSON)
+            
+        Returns:
+            Path of the written file
+        """
+        path = write_metrics(path, [self.metrics])
+        logger.info(f"gNMI metrics written to {path}")
+        return path
+    
+    def _record_payload(self, device_name, response):
+        # Size of the whole JSON-encoded Get reply, the same measure on every keyword
+        if self.payload_metrics and response:
+            self.metrics.add_payload(device_name, len(json.dumps(response, default=str)))
+    
+    def _start_suite(self, data, result):
+        if not self.metrics.scope:
+            self.metrics.scope = getattr(result, 'full_name', None) or result.longname
+            _RECORDERS.append(self.metrics)
+    
+    def _end_suite(self, data, result):
+        # Listener hook: publish the suite's timings as suite metadata and metrics file
+        scope = getattr(result, 'full_name', None) or result.longname
+        if scope != self.metrics.scope or not self.metrics:
+            return
+        for name, value in self.metrics.summary().items():
+            result.metadata[name] = value
+        if self.metrics_file:
+            path = self._metrics_path()
+            try:
+                result.metadata['gNMI Metrics File'] = write_metrics(path, [r for r in _RECORDERS if r])
+            except OSError as e:
+                logger.warn(f"Unable to write gNMI metrics to {path}: {e}")
+    
+    def _metrics_path(self):
+        # pabot runs each suite in its own process: one file per process, or they would replace each other's
+        index = BuiltIn().get_variable_value('${PABOTQUEUEINDEX}')
+        if index is None:
+            return self.metrics_file
+        path = Path(self.metrics_file)
+        return str(path.with_name(f"{path.stem}.{index}{path.suffix}"))
     
     def disconnect_from_device(self, device_name):
         """
@@ -183,11 +641,13 @@ class GnmiLibrary:
         Args:
             device_name: Name of the device
         """
+        self.stop_interface_telemetry(device_name)
+        self.clear_interface_cache(device_name)
         if device_name in self.devices:
             try:
-                self.devices[device_name].close()
-                logger.info(f"Disconnected from {device_name}")
                 del self.devices[device_name]
+                self.sessions.release(device_name)
+                logger.info(f"Disconnected from {device_name}")
             except Exception as e:
                 logger.warn(f"Error disconnecting from {device_name}: {str(e)}")
     